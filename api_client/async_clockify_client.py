@@ -0,0 +1,255 @@
+import asyncio
+import time
+import httpx
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+from api_client.clockify_client import CLOCKIFY_API_URL, ClockifyClientBase
+from api_client.http_session import send_with_retries
+from api_client.rate_limiter import get_bucket
+from utils.api_metrics import observe_outbound
+
+
+class AsyncClockifyClient(ClockifyClientBase):
+    """
+    Async (httpx) counterpart of ClockifyClient, every request method is a coroutine.
+    The number of requests in flight is limited by a semaphore, so the get_all_* fan-outs never flood the API.
+    Shares the url templates and helpers of ClockifyClientBase, user/project ids are awaited through get_user_ids/get_project_ids.
+    """
+
+    def __init__(self, api_key: str, workspace_id: str, page_size: int = 1000, max_concurrency: int = 8,
+                 timeout: float = 60.0, max_retries: int = 5, rate_limit: float = 50.0, rate_burst: int = 50,
+                 base_url: str = CLOCKIFY_API_URL):
+        """
+        Initializes the AsyncClockifyClient, no requests are made here.
+
+        Args:
+            api_key (str): Clockify API key
+            workspace_id (str): Clockify workspace ID
+            page_size (int): Number of records requested per page on paginated endpoints
+            max_concurrency (int): Max number of requests in flight at the same time
+            timeout (float): Timeout in seconds for every request
+            max_retries (int): Retries with exponential backoff on 429/5xx and connection errors (not for POST)
+            rate_limit (float): Requests per second allowed by the process wide clockify limiter
+            rate_burst (int): Requests that may be sent back to back before the limiter kicks in
+            base_url (str): Root of the clockify REST api, point it somewhere else to run against a stand-in server
+        """
+        self.page_size = page_size
+        self.max_workers = max_concurrency
+        self.max_retries = max_retries
+        self._configure(api_key or "", workspace_id, base_url) #httpx refuses None header values, a missing key just fails with a 401
+
+        self.client = httpx.AsyncClient(
+            headers=self.headers,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency),
+        )
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.rate_limiter = get_bucket("clockify", rate_limit, rate_burst) #same bucket as the sync client
+
+        self._user_ids: Optional[List[str]] = None #filled by get_user_ids on first use
+        self._project_ids: Optional[List[str]] = None #filled by get_project_ids on first use
+        self._ids_lock = asyncio.Lock()
+
+    def refresh_ids(self) -> None:
+        """Drops the cached user and project ids, the next get_*_ids call fetches them again."""
+        self._user_ids = None
+        self._project_ids = None
+
+    async def aclose(self) -> None:
+        """Closes the pooled connections of the client."""
+        await self.client.aclose()
+
+    async def _send(self, method: str, url: str, data_type: str, action: str, **kwargs) -> Optional[Any]:
+        """
+        Sends a request while holding the semaphore and returns its JSON body.
+
+        Args:
+            method (str): HTTP method
+            url (str): Full url of the request
+            data_type (str): Key of the url dict, only used in the log lines
+            action (str): "getting", "posting" or "updating", only used in the log lines
+            **kwargs: Passed on to httpx (params, json)
+
+        Returns:
+            dict | list | None: JSON response from the API, None on errors.
+        """
+        max_retries = 0 if method == "POST" else self.max_retries #a retried POST could create the resource twice
+
+        async with self.semaphore:
+            try:
+                await self.rate_limiter.acquire_async()
+                started = time.perf_counter()
+                try:
+                    response = await send_with_retries(
+                        self.client, method, url, max_retries=max_retries, rate_limiter=self.rate_limiter, **kwargs
+                    )
+                except httpx.HTTPError:
+                    observe_outbound("clockify", method, data_type, started, "error")
+                    raise
+                observe_outbound("clockify", method, data_type, started, str(response.status_code))
+                response.raise_for_status()
+                print(f"{method} request for '{data_type}' successful.")
+                return response.json()
+            except httpx.HTTPError as err:
+                print(f"Error while {action} '{data_type}': {err}")
+                return None
+
+    async def get_data(self, data_type: str, params: Optional[Dict[str, Any]] = None, **url_params):
+        """
+        Makes a GET request to the specified Clockify endpoint.
+
+        Args:
+            data_type (str): One of the keys in self.get_url_dict
+            params (Optional[Dict[str, Any]]): Optional query string parameters (e.g. page, page-size)
+            **url_params: Optional parameters to replace in the URL
+
+        Returns:
+            dict | list | None: JSON response from the API.
+        """
+        if data_type not in self.get_url_dict:
+            raise ValueError(f"Invalid data_type: {data_type}")
+
+        url = self.get_url_dict[data_type]
+        if '{' in url:
+            url = self.build_url(url, **url_params)
+
+        return await self._send("GET", url, data_type, "getting", params=params)
+
+    async def post_data(self, data_type: str, data: Dict[str, Any], **url_params) -> Optional[Dict[str, Any]]:
+        """
+        Sends a POST request to the specified Clockify endpoint.
+
+        Args:
+            data_type (str): One of the keys in self.post_url_dict
+            data (Dict[str, Any]): The JSON payload posted to clockify
+            **url_params: Parameters to insert into the URL template
+
+        Returns:
+            Optional[Dict[str, Any]]: JSON response from the API if successful.
+        """
+        if data_type not in self.post_url_dict:
+            raise ValueError(f"Invalid data_type: {data_type}")
+
+        url = self.post_url_dict[data_type]
+        if '{' in url:
+            url = self.build_url(url, **url_params)
+
+        return await self._send("POST", url, data_type, "posting", json=data)
+
+    async def put_data(self, data_type: str, data: Dict[str, Any], **url_params) -> Optional[Dict[str, Any]]:
+        """
+        Sends a PUT request to update a resource at a Clockify endpoint.
+
+        Args:
+            data_type (str): One of the keys in self.put_url_dict
+            data (Dict[str, Any]): The JSON payload
+            **url_params: Parameters to insert into the URL template
+
+        Returns:
+            Optional[Dict[str, Any]]: JSON response from the API if successful.
+        """
+        if data_type not in self.put_url_dict:
+            raise ValueError(f"Invalid data_type: {data_type}")
+
+        url = self.put_url_dict[data_type]
+        if '{' in url:
+            url = self.build_url(url, **url_params)
+
+        return await self._send("PUT", url, data_type, "updating", json=data)
+
+    #helper methods
+    async def get_user_ids(self) -> List[str]:
+        """Returns the ids of all users in the workspace, fetched once and cached (a failed fetch raises and caches nothing)."""
+        async with self._ids_lock:
+            if self._user_ids is None:
+                self._user_ids = [user["id"] for user in await self._required_data("users")]
+        return self._user_ids
+
+    async def get_project_ids(self) -> List[str]:
+        """Returns the ids of all projects in the workspace, fetched once and cached (a failed fetch raises and caches nothing)."""
+        async with self._ids_lock:
+            if self._project_ids is None:
+                self._project_ids = [project["id"] for project in await self._required_data("projects")]
+        return self._project_ids
+
+    async def _required_data(self, data_type: str) -> List[Dict[str, Any]]:
+        """get_data for the ids the fan-outs iterate over, an error raises instead of looking like an empty workspace."""
+        data = await self.get_data(data_type)
+        if data is None: #_send already printed the error
+            raise RuntimeError(f"Failed to get the clockify {data_type}, their ids are needed to fetch the rest.")
+        return data
+
+    async def get_paginated_data(self, data_type: str, params: Optional[Dict[str, Any]] = None, **url_params) -> List[Dict[str, Any]]:
+        """
+        Walks the page/page-size params of a Clockify GET endpoint until the data runs out.
+
+        Args:
+            data_type (str): One of the keys in self.get_url_dict
+            params (Optional[Dict[str, Any]]): Extra query string parameters sent with every page
+            **url_params: Parameters to insert into the URL template
+
+        Returns:
+            List[Dict[str, Any]]: The records of all pages combined.
+
+        Raises:
+            RuntimeError: When a page could not be fetched, so a failed request is never taken for the end of the data.
+        """
+        records = []
+        page = 1
+        while True:
+            page_params = {**(params or {}), "page": page, "page-size": self.page_size}
+            data = await self.get_data(data_type, params=page_params, **url_params)
+            if data is None: #get_data already printed the error
+                raise RuntimeError(f"Failed to get page {page} of '{data_type}' {url_params}, the records are incomplete.")
+            if not data:
+                break
+            records.extend(data)
+            if len(data) < self.page_size:
+                break
+            page += 1
+        return records
+
+    async def get_user_time_entries(self, user_id: str, start: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """
+        Retrieves every page of time entries for a single user.
+
+        Args:
+            user_id (str): ID of the Clockify user
+            start (Optional[datetime]): Only entries that started at or after this moment are returned
+
+        Returns:
+            List[Dict[str, Any]]: All time entries of the user.
+        """
+        params = {"start": self.format_datetime(start)} if start else None
+        return await self.get_paginated_data("user_time_entries", params=params, user_id=user_id)
+
+    async def get_all_time_entries(self, start: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """
+        Retrieves all time entries for all users in the workspace, users are fetched concurrently.
+
+        Args:
+            start (Optional[datetime]): Only entries that started at or after this moment are returned
+
+        Returns:
+            List[Dict[str, Any]]: All time entries across all users.
+        """
+        per_user_entries = await asyncio.gather(
+            *(self.get_user_time_entries(user_id, start=start) for user_id in await self.get_user_ids())
+        )
+        return [entry for entries in per_user_entries for entry in entries]
+
+    async def get_all_tasks(self) -> List[Dict[str, Any]]:
+        """
+        Retrieves every page of tasks of all projects in the workspace, projects are fetched concurrently.
+
+        Returns:
+            List[Dict[str, Any]]: All tasks from all projects.
+
+        Raises:
+            RuntimeError: When a page of a project could not be fetched, see get_paginated_data.
+        """
+        per_project_tasks = await asyncio.gather(
+            *(self.get_paginated_data("project_tasks", project_id=project_id) for project_id in await self.get_project_ids())
+        )
+        return [task for tasks in per_project_tasks for task in tasks]
@@ -0,0 +1,125 @@
+import asyncio
+import time
+import httpx
+from datetime import datetime
+from typing import Dict, Any, AsyncIterator, List, Optional
+
+from api_client.linear_client import (
+    LINEAR_API_URL, LINEAR_NESTED_PAGE_SIZE, LINEAR_OWNER_PAGE_SIZE, LINEAR_PAGE_SIZE, LinearClientBase,
+)
+from api_client.http_session import send_with_retries
+from api_client.rate_limiter import get_bucket
+from utils.api_metrics import observe_outbound
+
+
+class AsyncLinearClient(LinearClientBase):
+    """
+    Async (httpx) counterpart of LinearClient with the same queries (LinearClientBase), iter_pages and get_data are coroutines.
+    The number of requests in flight is limited by a semaphore.
+    """
+
+    def __init__(self, api_key: str, page_size: int = LINEAR_PAGE_SIZE, max_concurrency: int = 4,
+                 timeout: float = 120.0, max_retries: int = 5, rate_limit: float = 1500 / 3600, rate_burst: int = 60,
+                 url: str = LINEAR_API_URL, owner_page_size: int = LINEAR_OWNER_PAGE_SIZE,
+                 nested_page_size: int = LINEAR_NESTED_PAGE_SIZE):
+        """
+        Initializes the AsyncLinearClient, no requests are made here.
+
+        Args:
+            api_key (str): Linear API key for authentication.
+            page_size (int): Number of nodes requested per page.
+            max_concurrency (int): Max number of requests in flight at the same time.
+            timeout (float): Timeout in seconds for every request.
+            max_retries (int): Retries with exponential backoff on 429/5xx and connection errors.
+            rate_limit (float): Requests per second allowed by the process wide linear limiter.
+            rate_burst (int): Requests that may be sent back to back before the limiter kicks in.
+            url (str): The GraphQL endpoint, point it somewhere else to run against a stand-in server.
+            owner_page_size (int): Page size of the queries with a nested list, see LinearClient.
+            nested_page_size (int): Nodes requested per nested list.
+        """
+        self.page_size = page_size
+        self.owner_page_size = owner_page_size
+        self.nested_page_size = nested_page_size
+        self.max_retries = max_retries
+        self._configure(api_key or "", url) #httpx refuses None header values, a missing key just fails with a 401
+
+        self.client = httpx.AsyncClient(
+            headers=self.headers,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency),
+        )
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.rate_limiter = get_bucket("linear", rate_limit, rate_burst) #same bucket as the sync client
+
+    async def aclose(self) -> None:
+        """Closes the pooled connections of the client."""
+        await self.client.aclose()
+
+    async def iter_pages(self, query_name: str, updated_after: Optional[datetime] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Runs a GraphQL query specified by the query_name and yields its nodes one page at a time.
+
+        Args:
+            query_name (str): The key name of the query to execute.
+            updated_after (Optional[datetime]): Only nodes with an updatedAt newer than this are returned.
+
+        Yields:
+            List[Dict[str, Any]]: The nodes of a single page.
+
+        Raises:
+            RuntimeError: When a page fails (request error, graphql errors or no data), like LinearClient.iter_pages.
+        """
+        if query_name not in self.query_dict:
+            raise ValueError(f"Invalid query_name: {query_name}")
+
+        query = self.query_dict[query_name]
+        variables = self._variables(query_name, updated_after)
+
+        while True:
+            async with self.semaphore:
+                try:
+                    await self.rate_limiter.acquire_async()
+                    started = time.perf_counter()
+                    try:
+                        response = await send_with_retries(
+                            self.client, "POST", self.url, max_retries=self.max_retries, rate_limiter=self.rate_limiter,
+                            json={"query": query, "variables": variables}
+                        )
+                    except httpx.HTTPError:
+                        observe_outbound("linear", "POST", query_name, started, "error")
+                        raise
+                    observe_outbound("linear", "POST", query_name, started, str(response.status_code))
+                    self._throttle(response.headers)
+                    response.raise_for_status()
+                    result = response.json()
+                except httpx.HTTPError as err:
+                    raise RuntimeError(f"Error while getting '{query_name}': {err}") from err
+
+            if result.get("errors"):
+                raise RuntimeError(f"Error while getting '{query_name}': {result['errors']}")
+
+            connection = (result.get("data") or {}).get(query_name)
+            if connection is None:
+                raise RuntimeError(f"Error while getting '{query_name}': the response holds no {query_name} data.")
+            nodes = connection.get("nodes") or []
+            if nodes:
+                yield nodes
+
+            page_info = connection.get("pageInfo") or {}
+            if not page_info.get("hasNextPage"):
+                return
+            variables["after"] = page_info.get("endCursor")
+
+    async def get_data(self, query_name: str, updated_after: Optional[datetime] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Runs a GraphQL query specified by the query_name and collects the nodes of every page.
+
+        Args:
+            query_name (str): The key name of the query to execute.
+            updated_after (Optional[datetime]): Only nodes with an updatedAt newer than this are returned.
+
+        Returns:
+            list or None: All nodes returned by the API, or None if there are none (errors raise, see iter_pages).
+        """
+        nodes = [node async for page in self.iter_pages(query_name, updated_after=updated_after) for node in page]
+        return nodes or None
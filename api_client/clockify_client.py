@@ -1,23 +1,39 @@
 import requests
 import os
 import json
-from typing import List, Dict, Any, Optional
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import partial
+from typing import List, Dict, Any, Iterator, Optional, Tuple, Union
 
+from api_client.http_session import build_session
+from api_client.rate_limiter import get_bucket
+from utils.instrumentation import count_response, instrumented
 
-class ClockifyClient:
+CLOCKIFY_API_URL = "https://api.clockify.me/api/v1"
+
+#get url key -> entity name in the ETL metrics (the ENTITY_SPECS key), the rest are named clockify_<key>
+CLOCKIFY_ENTITIES = {"user_time_entries": "clockify_time_entries", "project_tasks": "clockify_tasks"}
+
+
+class ClockifyClientBase:
     """
-    A client to interact with the Clockify API.
-    Provides methods to fetch, create, and update users, projects, clients, tasks, and time entries.
+    Headers, url templates and helpers shared by ClockifyClient and the async AsyncClockifyClient,
+    which differ in how requests are sent. No requests are made here.
     """
 
-    def __init__(self, api_key: str, workspace_id: str):
+    def _configure(self, api_key: str, workspace_id: str, base_url: str = CLOCKIFY_API_URL) -> None:
         """
-        Initializes the ClockifyClient with the provided API key and workspace ID.
+        Sets the headers and url templates (no requests are made here).
 
         Args:
             api_key (str): Clockify API key
             workspace_id (str): Clockify workspace ID
+            base_url (str): Root of the clockify REST api
         """
+        base_url = base_url.rstrip("/")
         self.headers: Dict[str, str] = { #headers for all the requests to be successful
             "x-api-key": api_key,
             "Content-Type": "application/json",
@@ -25,29 +41,26 @@ class ClockifyClient:
         self.workspace_id = workspace_id
 
         self.get_url_dict = { #dict that has urls for get_requests in clockify
-            "users": f"https://api.clockify.me/api/v1/workspaces/{self.workspace_id}/users",
-            "projects": f"https://api.clockify.me/api/v1/workspaces/{self.workspace_id}/projects",
-            "clients": f"https://api.clockify.me/api/v1/workspaces/{self.workspace_id}/clients",
-            "time_entries_in_progress": f"https://api.clockify.me/api/v1/workspaces/{self.workspace_id}/time-entries/status/in-progress",
-            "user_time_entries": "https://api.clockify.me/api/v1/workspaces/{workspace_id}/user/{user_id}/time-entries",
-            "project_tasks": "https://api.clockify.me/api/v1/workspaces/{workspace_id}/projects/{project_id}/tasks"
+            "users": f"{base_url}/workspaces/{self.workspace_id}/users",
+            "projects": f"{base_url}/workspaces/{self.workspace_id}/projects",
+            "clients": f"{base_url}/workspaces/{self.workspace_id}/clients",
+            "time_entries_in_progress": f"{base_url}/workspaces/{self.workspace_id}/time-entries/status/in-progress",
+            "user_time_entries": base_url + "/workspaces/{workspace_id}/user/{user_id}/time-entries",
+            "project_tasks": base_url + "/workspaces/{workspace_id}/projects/{project_id}/tasks"
         }
 
         self.post_url_dict = { #dict that has urls for post_requests in clockify
-            "clients": f"https://api.clockify.me/api/v1/workspaces/{workspace_id}/clients",
-            "projects": f"https://api.clockify.me/api/v1/workspaces/{workspace_id}/projects",
-            "tasks": "https://api.clockify.me/api/v1/workspaces/{workspace_id}/projects/{project_id}/tasks"
+            "clients": f"{base_url}/workspaces/{workspace_id}/clients",
+            "projects": f"{base_url}/workspaces/{workspace_id}/projects",
+            "tasks": base_url + "/workspaces/{workspace_id}/projects/{project_id}/tasks"
         }
 
         self.put_url_dict = { #dict that has urls for put/update_requests in clockify
-            "clients": "https://api.clockify.me/api/v1/workspaces/{workspace_id}/clients/{client_id}",
-            "projects": "https://api.clockify.me/api/v1/workspaces/{workspace_id}/projects/{project_id}",
-            "tasks": "https://api.clockify.me/api/v1/workspaces/{workspace_id}/projects/{project_id}/tasks/{task_id}"
+            "clients": base_url + "/workspaces/{workspace_id}/clients/{client_id}",
+            "projects": base_url + "/workspaces/{workspace_id}/projects/{project_id}",
+            "tasks": base_url + "/workspaces/{workspace_id}/projects/{project_id}/tasks/{task_id}"
         }
 
-        self.user_ids = [user["id"] for user in self.get_data("users") or []]
-        self.project_ids = [project["id"] for project in self.get_data("projects") or []]
-
     def build_url(self, template: str, **kwargs) -> str:
         """
         builds a formatted url by removing place holders with actual vals.
@@ -61,12 +74,103 @@ class ClockifyClient:
         """
         return template.format(workspace_id=self.workspace_id, **kwargs) #replaces placeholders with actual vals
 
-    def get_data(self, data_type: str, **url_params):
+    def format_datetime(self, value: datetime) -> str:
+        """
+        Formats a datetime the way clockify expects it in query params (yyyy-MM-ddThh:mm:ssZ, UTC).
+
+        Args:
+            value (datetime): The datetime to format, naive datetimes are treated as UTC
+
+        Returns:
+            str: The formatted datetime.
+        """
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class ClockifyClient(ClockifyClientBase):
+    """
+    A client to interact with the Clockify API.
+    Provides methods to fetch, create, and update users, projects, clients, tasks, and time entries.
+    """
+
+    def __init__(self, api_key: str, workspace_id: str, page_size: int = 1000, max_workers: int = 8,
+                 pool_size: Optional[int] = None, timeout: Union[float, Tuple[float, float]] = (5, 60), max_retries: int = 5,
+                 rate_limit: float = 50.0, rate_burst: int = 50, base_url: str = CLOCKIFY_API_URL):
+        """
+        Initializes the ClockifyClient with the provided API key and workspace ID, no requests are made here.
+
+        Args:
+            api_key (str): Clockify API key
+            workspace_id (str): Clockify workspace ID
+            page_size (int): Number of records requested per page on paginated endpoints (Clockify allows up to 1000)
+            max_workers (int): Max number of users whose time entries are fetched at the same time
+            pool_size (Optional[int]): Connections kept alive in the shared session, defaults to max_workers
+            timeout (float | Tuple[float, float]): (connect, read) timeout in seconds for every request
+            max_retries (int): Retries with exponential backoff on 429/5xx and connection errors (GET and PUT only)
+            rate_limit (float): Requests per second allowed by the process wide clockify limiter (clockify allows 50/s per workspace)
+            rate_burst (int): Requests that may be sent back to back before the limiter kicks in
+            base_url (str): Root of the clockify REST api, point it somewhere else to run against a stand-in server
+        """
+        self.page_size = page_size
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.rate_limiter = get_bucket("clockify", rate_limit, rate_burst) #shared by every clockify client of the process
+        #one pooled session for every call, its retries take their tokens from the same limiter
+        self.session = build_session(pool_size=pool_size or max_workers, max_retries=max_retries, rate_limiter=self.rate_limiter)
+        self._configure(api_key, workspace_id, base_url)
+
+        #user/project ids are fetched on first use (see the properties below), so building a client never waits on clockify
+        self._user_ids: Optional[List[str]] = None
+        self._project_ids: Optional[List[str]] = None
+        self._ids_lock = threading.Lock() #worker threads asking for the ids at the same time only trigger one fetch
+
+    @property
+    def user_ids(self) -> List[str]:
+        """
+        Ids of all users in the workspace, fetched on first access and cached until refresh_ids is called.
+        A failed fetch raises RuntimeError and caches nothing, the next access tries again.
+        """
+        if self._user_ids is None:
+            with self._ids_lock:
+                if self._user_ids is None:
+                    self._user_ids = [user["id"] for user in self._required_data("users")]
+        return self._user_ids
+
+    @property
+    def project_ids(self) -> List[str]:
+        """
+        Ids of all projects in the workspace, fetched on first access and cached until refresh_ids is called.
+        A failed fetch raises RuntimeError and caches nothing, the next access tries again.
+        """
+        if self._project_ids is None:
+            with self._ids_lock:
+                if self._project_ids is None:
+                    self._project_ids = [project["id"] for project in self._required_data("projects")]
+        return self._project_ids
+
+    def _required_data(self, data_type: str) -> List[Dict[str, Any]]:
+        """get_data for the ids the syncs iterate over, an error raises instead of looking like an empty workspace."""
+        data = self.get_data(data_type)
+        if data is None: #get_data already printed the error
+            raise RuntimeError(f"Failed to get the clockify {data_type}, their ids are needed to fetch the rest.")
+        return data
+
+    def refresh_ids(self) -> None:
+        """Drops the cached user and project ids, the next access fetches them again."""
+        with self._ids_lock:
+            self._user_ids = None
+            self._project_ids = None
+
+    @instrumented("extract", lambda self, data_type, *args, **kwargs: CLOCKIFY_ENTITIES.get(data_type, f"clockify_{data_type}"))
+    def get_data(self, data_type: str, params: Optional[Dict[str, Any]] = None, **url_params):
         """
         Makes a GET request to the specified Clockify endpoint.
 
         Args:
             data_type (str): One of the keys in self.get_url_dict, used to access the proper url
+            params (Optional[Dict[str, Any]]): Optional query string parameters (e.g. page, page-size)
             **url_params: Optional parameters to replace in the URL, necessary for some urls thouhg
 
         Returns:
@@ -80,7 +184,9 @@ class ClockifyClient:
             url = self.build_url(url, **url_params)
 
         try:
-            response = requests.get(url, headers=self.headers)
+            self.rate_limiter.acquire()
+            response = self.session.get(url, headers=self.headers, params=params, timeout=self.timeout)
+            count_response(len(response.content))
             response.raise_for_status()
             print(f"GET request for '{data_type}' successful.")
             return response.json()
@@ -108,7 +214,8 @@ class ClockifyClient:
             url = self.build_url(url, **url_params)
 
         try:
-            response = requests.post(url, headers=self.headers, json=data)
+            self.rate_limiter.acquire()
+            response = self.session.post(url, headers=self.headers, json=data, timeout=self.timeout)
             response.raise_for_status()
             print(f"POST request for '{data_type}' successful.")
             return response.json()
@@ -136,7 +243,8 @@ class ClockifyClient:
             url = self.build_url(url, **url_params)
 
         try:
-            response = requests.put(url, headers=self.headers, json=data)
+            self.rate_limiter.acquire()
+            response = self.session.put(url, headers=self.headers, json=data, timeout=self.timeout)
             response.raise_for_status()
             print(f"PUT request for '{data_type}' successful.")
             return response.json()
@@ -145,29 +253,154 @@ class ClockifyClient:
             return None
 
     #helper methods
-    def get_all_time_entries(self) -> List[Dict[str, Any]]: #
+    def iter_pages(self, data_type: str, params: Optional[Dict[str, Any]] = None, **url_params) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Walks the page/page-size params of a Clockify GET endpoint until the data runs out, one page at a time.
+
+        Args:
+            data_type (str): One of the keys in self.get_url_dict
+            params (Optional[Dict[str, Any]]): Extra query string parameters sent with every page
+            **url_params: Parameters to insert into the URL template
+
+        Yields:
+            List[Dict[str, Any]]: The records of a single page.
+
+        Raises:
+            RuntimeError: When a page could not be fetched, so a failed request is never taken for the end of the data.
+        """
+        page = 1
+        while True:
+            page_params = {**(params or {}), "page": page, "page-size": self.page_size}
+            data = self.get_data(data_type, params=page_params, **url_params)
+            if data is None: #get_data already printed the error
+                raise RuntimeError(f"Failed to get page {page} of '{data_type}' {url_params}, the records are incomplete.")
+            if not data:
+                break
+            yield data
+            if len(data) < self.page_size: #a short page is the last one, no need for an extra empty request
+                break
+            page += 1
+
+    def get_paginated_data(self, data_type: str, params: Optional[Dict[str, Any]] = None, **url_params) -> List[Dict[str, Any]]:
+        """
+        Walks the page/page-size params of a Clockify GET endpoint until the data runs out.
+
+        Args:
+            data_type (str): One of the keys in self.get_url_dict
+            params (Optional[Dict[str, Any]]): Extra query string parameters sent with every page
+            **url_params: Parameters to insert into the URL template
+
+        Returns:
+            List[Dict[str, Any]]: The records of all pages combined.
+        """
+        return [record for page in self.iter_pages(data_type, params=params, **url_params) for record in page]
+
+    def get_user_time_entries(self, user_id: str, start: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """
+        Retrieves every page of time entries for a single user.
+
+        Args:
+            user_id (str): ID of the Clockify user
+            start (Optional[datetime]): Only entries that started at or after this moment are returned
+
+        Returns:
+            List[Dict[str, Any]]: All time entries of the user.
+        """
+        params = {"start": self.format_datetime(start)} if start else None
+        return self.get_paginated_data("user_time_entries", params=params, user_id=user_id)
+
+    def get_all_time_entries(self, start: Optional[datetime] = None) -> List[Dict[str, Any]]:
         """
         Retrieves all time entries for all users in the workspace.
+        Users are fetched concurrently by a pool of at most self.max_workers threads.
+
+        Args:
+            start (Optional[datetime]): Only entries that started at or after this moment are returned (incremental sync)
 
         Returns:
             List[Dict[str, Any]]: All time entries across all users.
         """
-        return [
-            entry
-            for user_id in self.user_ids
-            for entry in self.get_data("user_time_entries", user_id=user_id) or []
-        ]
+        fetch_user = partial(self.get_user_time_entries, start=start)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            per_user_entries = executor.map(fetch_user, self.user_ids) #map keeps the order of user_ids
+
+            return [
+                entry
+                for entries in per_user_entries
+                for entry in entries
+            ]
+
+    def iter_all_time_entry_pages(self, start: Optional[datetime] = None,
+                                  max_buffered_pages: Optional[int] = None) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Yields the pages of time entries of all users as soon as they arrive, users are fetched concurrently by a pool
+        of at most self.max_workers threads. The workers block once max_buffered_pages pages wait for the consumer,
+        so a slow consumer holds back the fetching instead of piling up pages in memory.
+
+        Args:
+            start (Optional[datetime]): Only entries that started at or after this moment are returned (incremental sync)
+            max_buffered_pages (Optional[int]): Pages fetched ahead of the consumer, defaults to 2 * self.max_workers
+
+        Yields:
+            List[Dict[str, Any]]: A page of time entries (pages of different users interleave).
+
+        Raises:
+            RuntimeError: When a page of any user could not be fetched (see iter_pages).
+        """
+        params = {"start": self.format_datetime(start)} if start else None
+        pages = queue.Queue(maxsize=max_buffered_pages or 2 * self.max_workers)
+        stopped = threading.Event() #set when the consumer stops early, so blocked workers give up instead of hanging
+        user_done = object()
+
+        def put(item):
+            while not stopped.is_set():
+                try:
+                    pages.put(item, timeout=0.5)
+                    return
+                except queue.Full:
+                    continue
+
+        def fetch_user(user_id):
+            try:
+                for page in self.iter_pages("user_time_entries", params=params, user_id=user_id):
+                    if stopped.is_set():
+                        return
+                    put(page)
+            except Exception as e: #handed to the consumer, the future of a submitted worker is never looked at
+                put(e)
+            finally:
+                put(user_done)
+
+        user_ids = self.user_ids
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for user_id in user_ids:
+                executor.submit(fetch_user, user_id)
+            try:
+                remaining = len(user_ids)
+                while remaining:
+                    page = pages.get()
+                    if page is user_done:
+                        remaining -= 1
+                    elif isinstance(page, Exception):
+                        raise page
+                    else:
+                        yield page
+            finally:
+                stopped.set()
 
     def get_all_tasks(self) -> List[Dict[str, Any]]:
         """
-        Retrieves all tasks from all projects in the workspace.
+        Retrieves every page of tasks of all projects in the workspace.
 
         Returns:
             List[Dict[str, Any]]: All tasks from all projects.
+
+        Raises:
+            RuntimeError: When a page of a project could not be fetched, see iter_pages.
         """
         return [
             task
             for project_id in self.project_ids
-            for task in self.get_data("project_tasks", project_id=project_id) or []
+            for task in self.get_paginated_data("project_tasks", project_id=project_id)
         ]
 
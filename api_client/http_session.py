@@ -0,0 +1,143 @@
+import asyncio
+import random
+import httpx
+import requests
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Iterable, Optional
+
+from api_client.rate_limiter import TokenBucket
+
+#status codes worth retrying: rate limited or a hiccup on the server side
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class RateLimitedRetry(Retry):
+    """
+    Retry policy that takes a token of the API's rate limiter after every backoff, so a retry counts against the limit
+    like the request it repeats (a burst of 429s would otherwise be retried on top of the limit the bucket enforces).
+    """
+
+    def __init__(self, *args, rate_limiter: Optional[TokenBucket] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.rate_limiter = rate_limiter
+
+    def new(self, **kw) -> "RateLimitedRetry":
+        retry = super().new(**kw) #urllib3 builds a new Retry per attempt from its own known arguments only
+        retry.rate_limiter = self.rate_limiter
+        return retry
+
+    def sleep(self, response=None) -> None:
+        super().sleep(response)
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+
+
+def build_session(
+    pool_size: int = 10,
+    max_retries: int = 5,
+    backoff_factor: float = 0.5,
+    backoff_jitter: float = 0.5,
+    retry_methods: Iterable[str] = ("GET", "PUT"),
+    rate_limiter: Optional[TokenBucket] = None,
+) -> requests.Session:
+    """
+    Builds a requests Session shared by all the calls of an API client, so connections are pooled and kept alive
+    instead of paying a new TCP+TLS handshake for every request.
+
+    Args:
+        pool_size (int): Max number of connections kept open per host (should be >= the number of threads using the session)
+        max_retries (int): Max number of retries on connection errors and on RETRY_STATUSES
+        backoff_factor (float): Base of the exponential backoff between retries (backoff_factor * 2 ** retry seconds)
+        backoff_jitter (float): Max random seconds added to every backoff so parallel workers do not retry in lockstep
+        retry_methods (Iterable[str]): HTTP methods that are safe to retry (POST creates things in clockify, so it is left out by default)
+        rate_limiter (Optional[TokenBucket]): Limiter every retry takes a token from (the first attempt is the caller's)
+
+    Returns:
+        requests.Session: Session with a pooled, retrying adapter mounted for http and https.
+    """
+    retry = RateLimitedRetry(
+        total=max_retries,
+        backoff_factor=backoff_factor,
+        backoff_jitter=backoff_jitter,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(method.upper() for method in retry_methods),
+        respect_retry_after_header=True, #a Retry-After header on a 429/503 wins over the computed backoff
+        raise_on_status=False, #hand back the last response, raise_for_status in the clients reports it
+        rate_limiter=rate_limiter,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def retry_delay(attempt: int, backoff_factor: float = 0.5, backoff_jitter: float = 0.5, retry_after: Optional[str] = None) -> float:
+    """
+    Seconds to sleep before a retry: the Retry-After header when the server sent one, exponential backoff with jitter otherwise.
+
+    Args:
+        attempt (int): Number of the retry about to be made (starting at 0)
+        backoff_factor (float): Base of the exponential backoff
+        backoff_jitter (float): Max random seconds added to the backoff
+        retry_after (Optional[str]): Value of the Retry-After header (seconds or an HTTP date)
+
+    Returns:
+        float: Seconds to wait.
+    """
+    if retry_after:
+        try:
+            return max(float(retry_after), 0.0)
+        except ValueError:
+            try:
+                return max((parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds(), 0.0)
+            except (TypeError, ValueError):
+                pass #unparseable header, fall back to the backoff
+    return backoff_factor * (2 ** attempt) + random.uniform(0, backoff_jitter)
+
+
+async def send_with_retries(
+    client: httpx.AsyncClient,
+    method: str,
+    url: str,
+    max_retries: int = 5,
+    backoff_factor: float = 0.5,
+    backoff_jitter: float = 0.5,
+    rate_limiter: Optional[TokenBucket] = None,
+    **kwargs,
+) -> httpx.Response:
+    """
+    Async counterpart of the retrying adapter of build_session: sends a request and retries it on connection errors
+    and RETRY_STATUSES with exponential backoff and jitter, respecting Retry-After.
+
+    Args:
+        client (httpx.AsyncClient): The pooled client to send the request with
+        method (str): HTTP method
+        url (str): Full url of the request
+        max_retries (int): Max number of retries
+        backoff_factor (float): Base of the exponential backoff
+        backoff_jitter (float): Max random seconds added to every backoff
+        rate_limiter (Optional[TokenBucket]): Limiter every retry takes a token from (the first attempt is the caller's)
+        **kwargs: Passed on to httpx (params, json, ...)
+
+    Returns:
+        httpx.Response: The last response (callers check its status).
+    """
+    for attempt in range(max_retries + 1):
+        if attempt and rate_limiter is not None: #a retry is one more request against the API's limit
+            await rate_limiter.acquire_async()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.TransportError:
+            if attempt == max_retries:
+                raise
+            await asyncio.sleep(retry_delay(attempt, backoff_factor, backoff_jitter))
+            continue
+
+        if response.status_code not in RETRY_STATUSES or attempt == max_retries:
+            return response
+        await asyncio.sleep(retry_delay(attempt, backoff_factor, backoff_jitter, response.headers.get("Retry-After")))
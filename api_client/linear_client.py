@@ -1,22 +1,38 @@
 import requests
-from typing import Dict, Any, Optional
+from datetime import datetime
+from typing import Dict, Any, Iterator, List, Optional, Tuple, Union
+
+from api_client.http_session import build_session
+from api_client.rate_limiter import get_bucket
+from utils.instrumentation import count_response, instrumented
 import os
 import json
 
-class LinearClient:
+LINEAR_API_URL = "https://api.linear.app/graphql"
+#linear refuses queries above 10,000 complexity points, and a nested connection multiplies the points of its nodes
+#by its `first` (50 when not given), so the page size is picked from that budget rather than the 250 linear allows
+LINEAR_PAGE_SIZE = 100
+#the queries whose nodes carry a nested list that is stored whole (the links of projects and teams, the issues of a cycle)
+#get smaller pages: owners per page times nested nodes per owner is what linear charges for them
+NESTED_QUERIES = ("projects", "teams", "cycles")
+LINEAR_OWNER_PAGE_SIZE = 50
+LINEAR_NESTED_PAGE_SIZE = 50
+
+class LinearClientBase:
     """
-    A client for interacting with the Linear GraphQL API.
-    Provides methods to query various entities such as users, teams, projects, issues, etc.
+    Url, headers, GraphQL queries and rate limit handling shared by LinearClient and the async AsyncLinearClient,
+    which differ in how requests are sent. Subclasses set self.rate_limiter. No requests are made here.
     """
 
-    def __init__(self, api_key: str):
+    def _configure(self, api_key: str, url: str = LINEAR_API_URL) -> None:
         """
-        Initializes the LinearClient with an API key.
+        Sets the url, headers and GraphQL queries (no requests are made here).
 
         Args:
             api_key (str): Linear API key for authentication.
+            url (str): The GraphQL endpoint.
         """
-        self.url = "https://api.linear.app/graphql"
+        self.url = url
         self.headers: Dict[str, str] = {
             "Authorization": api_key,
             "Content-Type": "application/json",
@@ -25,8 +41,8 @@ class LinearClient:
         # Store all GraphQL queries here with descriptive keys
         self.query_dict = {
             "customers": """
-                query Nodes {
-                    customers {
+                query Customers($first: Int, $after: String, $filter: CustomerFilter) {
+                    customers(first: $first, after: $after, filter: $filter) {
                         nodes {
                             id
                             name
@@ -40,13 +56,14 @@ class LinearClient:
                             archivedAt
                             mainSourceId
                         }
+                        pageInfo { hasNextPage endCursor }
                     }
                 }
             """,
 
             "users": """
-                query Users {
-                    users {
+                query Users($first: Int, $after: String, $filter: UserFilter) {
+                    users(first: $first, after: $after, filter: $filter) {
                         nodes {
                             id
                             name
@@ -62,13 +79,14 @@ class LinearClient:
                             statusUntilAt
                             initials
                         }
+                        pageInfo { hasNextPage endCursor }
                     }
                 }
             """,
 
             "projects": """
-                query Projects {
-                    projects {
+                query Projects($first: Int, $after: String, $filter: ProjectFilter, $nestedFirst: Int) {
+                    projects(first: $first, after: $after, filter: $filter) {
                         nodes {
                             id
                             creator { id name }
@@ -77,22 +95,25 @@ class LinearClient:
                             startDate
                             startedAt
                             createdAt
+                            updatedAt
                             completedAt
                             lead { id name }
                             description
                             priority
                             status { type }
-                            teams {
+                            teams(first: $nestedFirst) {
                                 nodes { id name }
+                                pageInfo { hasNextPage }
                             }
                         }
+                        pageInfo { hasNextPage endCursor }
                     }
                 }
             """,
 
             "issues": """
-                query Issues {
-                    issues {
+                query Issues($first: Int, $after: String, $filter: IssueFilter) {
+                    issues(first: $first, after: $after, filter: $filter) {
                         nodes {
                             assignee { id }
                             completedAt
@@ -105,7 +126,7 @@ class LinearClient:
                             dueDate
                             estimate
                             supervisor { id }
-                            needs { nodes { id } }
+                            needs(first: 10) { nodes { id } }
                             title
                             triagedAt
                             updatedAt
@@ -121,13 +142,14 @@ class LinearClient:
                             snoozedBy { id }
                             startedTriageAt
                         }
+                        pageInfo { hasNextPage endCursor }
                     }
                 }
             """,
 
             "cycles": """
-                query Cycles {
-                    cycles {
+                query Cycles($first: Int, $after: String, $filter: CycleFilter, $nestedFirst: Int) {
+                    cycles(first: $first, after: $after, filter: $filter) {
                         nodes {
                             completedAt
                             createdAt
@@ -141,19 +163,20 @@ class LinearClient:
                             startsAt
                             team { id }
                             updatedAt
-                            issues { nodes { id } }
+                            issues(first: $nestedFirst) { nodes { id } }
                             progressHistory
                             scopeHistory
                             autoArchivedAt
                             archivedAt
                         }
+                        pageInfo { hasNextPage endCursor }
                     }
                 }
             """,
 
             "teams": """
-                query Teams {
-                    teams {
+                query Teams($first: Int, $after: String, $filter: TeamFilter, $nestedFirst: Int) {
+                    teams(first: $first, after: $after, filter: $filter) {
                         nodes {
                             id
                             name
@@ -162,41 +185,159 @@ class LinearClient:
                             key
                             cycleStartDay
                             createdAt
+                            updatedAt
                             archivedAt
-                            members { nodes { id } }
+                            members(first: $nestedFirst) { nodes { id } pageInfo { hasNextPage } }
                         }
+                        pageInfo { hasNextPage endCursor }
                     }
                 }
             """
         }
 
-    def get_data(self, query_name: str) -> Optional[Dict[str, Any]]:
+    def _variables(self, query_name: str, updated_after: Optional[datetime] = None) -> Dict[str, Any]:
         """
-        Runs a GraphQL query specified by the query_name.
+        Variables of the first page of a query, the queries in NESTED_QUERIES get owner_page_size nodes per page
+        and nested_page_size nodes per nested list.
 
         Args:
-            query_name (str): The key name of the query to execute.
+            query_name (str): The key name of the query.
+            updated_after (Optional[datetime]): Only nodes with an updatedAt newer than this are returned.
 
         Returns:
-            dict or None: Parsed JSON response from the API, or None if error/no data.
+            Dict[str, Any]: first, after and filter (and nestedFirst).
+        """
+        variables = {"first": self.page_size, "after": None, "filter": None}
+        if query_name in NESTED_QUERIES:
+            variables["first"] = self.owner_page_size
+            variables["nestedFirst"] = self.nested_page_size
+        if updated_after is not None:
+            variables["filter"] = {"updatedAt": {"gt": updated_after.isoformat()}}
+        return variables
+
+    def _throttle(self, headers) -> None:
+        """
+        Reads linear's rate limit headers and pauses the shared limiter until the window resets when the request
+        budget is spent or the complexity budget left cannot pay for another query as expensive as the last one.
+
+        Args:
+            headers (Mapping[str, str]): Headers of the last response (case insensitive).
+        """
+        def header(name):
+            value = headers.get(name)
+            return int(float(value)) if value is not None else None
+
+        requests_left = header("X-RateLimit-Requests-Remaining")
+        if requests_left is not None and requests_left <= 1:
+            reset_ms = header("X-RateLimit-Requests-Reset") #unix time in ms
+            if reset_ms:
+                print("Linear request budget spent, pausing until it resets.")
+                self.rate_limiter.pause_until(reset_ms / 1000)
+
+        complexity_left = header("X-RateLimit-Complexity-Remaining")
+        last_complexity = header("X-Complexity")
+        if complexity_left is not None and last_complexity is not None and complexity_left < last_complexity:
+            reset_ms = header("X-RateLimit-Complexity-Reset")
+            if reset_ms:
+                print("Linear complexity budget spent, pausing until it resets.")
+                self.rate_limiter.pause_until(reset_ms / 1000)
+
+
+class LinearClient(LinearClientBase):
+    """
+    A client for interacting with the Linear GraphQL API.
+    Provides methods to query various entities such as users, teams, projects, issues, etc.
+    """
+
+    def __init__(self, api_key: str, page_size: int = LINEAR_PAGE_SIZE, pool_size: int = 4,
+                 timeout: Union[float, Tuple[float, float]] = (5, 120), max_retries: int = 5,
+                 rate_limit: float = 1500 / 3600, rate_burst: int = 60, url: str = LINEAR_API_URL,
+                 owner_page_size: int = LINEAR_OWNER_PAGE_SIZE, nested_page_size: int = LINEAR_NESTED_PAGE_SIZE):
+        """
+        Initializes the LinearClient with an API key.
+
+        Args:
+            api_key (str): Linear API key for authentication.
+            page_size (int): Number of nodes requested per page (the `first` argument). Linear allows up to 250,
+                but a page times the nested nodes of each of its nodes must stay under the complexity cap.
+            pool_size (int): Connections kept alive in the shared session.
+            timeout (float | Tuple[float, float]): (connect, read) timeout in seconds for every request.
+            max_retries (int): Retries with exponential backoff on 429/5xx and connection errors.
+            rate_limit (float): Requests per second allowed by the process wide linear limiter (api keys get 1500 requests/hour).
+            rate_burst (int): Requests that may be sent back to back before the limiter kicks in.
+            url (str): The GraphQL endpoint, point it somewhere else to run against a stand-in server.
+            owner_page_size (int): Page size of the queries with a nested list (NESTED_QUERIES).
+            nested_page_size (int): Nodes requested per nested list, a longer list comes back with hasNextPage set.
+        """
+        self.page_size = page_size
+        self.owner_page_size = owner_page_size
+        self.nested_page_size = nested_page_size
+        self.timeout = timeout
+        self.rate_limiter = get_bucket("linear", rate_limit, rate_burst) #shared by every linear client of the process
+        #graphql reads go over POST, they are safe to retry
+        self.session = build_session(pool_size=pool_size, max_retries=max_retries, retry_methods=("POST",),
+                                     rate_limiter=self.rate_limiter)
+        self._configure(api_key, url)
+
+    def iter_pages(self, query_name: str, updated_after: Optional[datetime] = None) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Runs a GraphQL query specified by the query_name and yields its nodes one page at a time,
+        following pageInfo.endCursor until hasNextPage is false.
+
+        Args:
+            query_name (str): The key name of the query to execute.
+            updated_after (Optional[datetime]): Only nodes with an updatedAt newer than this are returned (incremental sync).
+
+        Yields:
+            List[Dict[str, Any]]: The nodes of a single page.
+
+        Raises:
+            RuntimeError: When a page fails (request error, graphql errors or no data), so what was yielded until then
+                is never taken for every node. Pages are ordered by createdAt, not updatedAt, a partial run is not a prefix.
         """
         if query_name not in self.query_dict: #checks if url exists
             raise ValueError(f"Invalid query_name: {query_name}")
 
         query = self.query_dict[query_name]
+        variables = self._variables(query_name, updated_after)
 
-        try:
-            response = requests.post(self.url, json={"query": query}, headers=self.headers)
-            response.raise_for_status()
-            result = response.json()
-            # check if nodes exist in data and are non-empty, otherwise return None
-            nodes = result.get("data", {}).get(query_name, {}).get("nodes")
+        while True:
+            try:
+                self.rate_limiter.acquire()
+                response = self.session.post(self.url, json={"query": query, "variables": variables}, headers=self.headers, timeout=self.timeout)
+                count_response(len(response.content))
+                self._throttle(response.headers)
+                response.raise_for_status()
+                result = response.json()
+            except requests.exceptions.RequestException as err:
+                raise RuntimeError(f"Error while getting '{query_name}': {err}") from err
+
+            if result.get("errors"): #graphql errors still come back with a 200
+                raise RuntimeError(f"Error while getting '{query_name}': {result['errors']}")
+
+            connection = (result.get("data") or {}).get(query_name)
+            if connection is None:
+                raise RuntimeError(f"Error while getting '{query_name}': the response holds no {query_name} data.")
+            nodes = connection.get("nodes") or []
             if nodes:
-                return nodes
-            else:
-                # sometimes the root might not be named exactly after the query_name (e.g. customers query)
-                # so fallback to return full data if nodes is None
-                return result.get("data")
-        except requests.exceptions.RequestException as err:
-            print(f"Error while getting '{query_name}': {err}")
-            return None
+                yield nodes
+
+            page_info = connection.get("pageInfo") or {}
+            if not page_info.get("hasNextPage"):
+                return
+            variables["after"] = page_info.get("endCursor")
+
+    @instrumented("extract", lambda self, query_name, *args, **kwargs: f"linear_{query_name}")
+    def get_data(self, query_name: str, updated_after: Optional[datetime] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Runs a GraphQL query specified by the query_name and collects the nodes of every page.
+
+        Args:
+            query_name (str): The key name of the query to execute.
+            updated_after (Optional[datetime]): Only nodes with an updatedAt newer than this are returned.
+
+        Returns:
+            list or None: All nodes returned by the API, or None if there are none (errors raise, see iter_pages).
+        """
+        nodes = [node for page in self.iter_pages(query_name, updated_after=updated_after) for node in page]
+        return nodes or None
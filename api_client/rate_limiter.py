@@ -0,0 +1,86 @@
+import asyncio
+import threading
+import time
+from typing import Dict
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter that can be shared by threads and asyncio tasks of one process.
+    Every request takes a token, tokens refill at `rate` per second up to `capacity` (the allowed burst).
+    The bucket can also be paused until a moment in time, e.g. the reset of a server side rate limit window.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        Args:
+            rate (float): Tokens added per second (the sustained request rate)
+            capacity (float): Max tokens stored (the allowed burst)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0 #monotonic clock
+        self.lock = threading.Lock() #only held for the bookkeeping, never while sleeping
+
+    def _reserve(self) -> float:
+        """
+        Takes a token (going negative means reserving a future one) and returns how long the caller has to wait.
+
+        Returns:
+            float: Seconds to wait before sending the request.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.paused_until - now)
+
+    def acquire(self) -> None:
+        """Blocks the calling thread until a request may be sent."""
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        """Waits, without blocking the event loop, until a request may be sent."""
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def pause_until(self, epoch_seconds: float) -> None:
+        """
+        Holds back every request until a wall clock moment (e.g. the reset time a server reported).
+
+        Args:
+            epoch_seconds (float): Unix timestamp in seconds
+        """
+        with self.lock:
+            resume = time.monotonic() + max(epoch_seconds - time.time(), 0.0)
+            self.paused_until = max(self.paused_until, resume)
+
+
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def get_bucket(name: str, rate: float, capacity: float) -> TokenBucket:
+    """
+    Returns the process wide bucket of an API, created on first use. Every client instance of the same API
+    gets the same bucket, so the limit holds no matter how many clients, threads or tasks are sending requests.
+
+    Args:
+        name (str): Name of the API (e.g. "clockify")
+        rate (float): Tokens added per second, only used when the bucket is created
+        capacity (float): Allowed burst, only used when the bucket is created
+
+    Returns:
+        TokenBucket: The shared bucket.
+    """
+    with _buckets_lock:
+        if name not in _buckets:
+            _buckets[name] = TokenBucket(rate, capacity)
+        return _buckets[name]
@@ -0,0 +1,375 @@
+import argparse
+import base64
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.synthetic_data import SyntheticWorkspace
+
+"""
+Local stand-ins for the Clockify REST api and the Linear GraphQL api, serving a SyntheticWorkspace so the ETL can be
+benchmarked without touching the real services. Built on the standard library http server, one thread per connection.
+
+Clockify: the GET urls of ClockifyClient.get_url_dict with page/page-size pagination (50 records per page unless
+page-size is sent, like the real api), the start filter of the time entries, POST/PUT echo the payload back.
+Requests over the rate limit (50/s per workspace, like the real api) get a 429 with a Retry-After header.
+
+Linear: the queries of LinearClient.query_dict (the root field picks the entity), first/after cursor pagination,
+nested connections cut to their first, the updatedAt filter, and linear's rate limit headers (requests and complexity
+per hour). Queries scored above 10,000 complexity points are refused, over the limit the request gets a 429 with a
+Retry-After header.
+
+Serve both on fixed ports from the root dir:
+python -m benchmarks.standin_servers --clockify-port 8801 --linear-port 8802 --users 100 --entries-per-user 1000
+"""
+
+
+class FixedWindowLimiter:
+    """Counts hits per fixed window of time, the way both APIs account their rate limits."""
+
+    def __init__(self, limit: float, window: float):
+        """
+        Args:
+            limit (float): Hits allowed per window (points for the complexity limit)
+            window (float): Length of a window in seconds
+        """
+        self.limit = limit
+        self.window = window
+        self.started = time.time()
+        self.used = 0.0
+        self.lock = threading.Lock()
+
+    def hit(self, cost: float = 1) -> Tuple[bool, float, float]:
+        """
+        Spends cost from the current window.
+
+        Args:
+            cost (float): Points the hit costs
+
+        Returns:
+            Tuple[bool, float, float]: Whether the hit fits in the window, what is left of it and when it resets (epoch seconds).
+        """
+        with self.lock:
+            now = time.time()
+            if now - self.started >= self.window:
+                self.started, self.used = now, 0.0
+            allowed = self.used + cost <= self.limit
+            if allowed:
+                self.used += cost
+            return allowed, max(self.limit - self.used, 0.0), self.started + self.window
+
+
+class StandInServer(ThreadingHTTPServer):
+    """HTTP server holding the workspace and the limiters its request handler reads."""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], handler, workspace: SyntheticWorkspace, **options):
+        super().__init__(address, handler)
+        self.workspace = workspace
+        self.options = options
+        self.limiters: Dict[str, FixedWindowLimiter] = {}
+
+    def serve_in_thread(self) -> threading.Thread:
+        """Starts serving on a daemon thread and returns it, stop with shutdown()."""
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+
+class JsonHandler(BaseHTTPRequestHandler):
+    """Shared helpers of the stand-in handlers."""
+
+    protocol_version = "HTTP/1.1" #keep-alive, the clients pool their connections
+    disable_nagle_algorithm = True #headers and body go out in separate writes, nagle would hold the body for an ack
+    server: StandInServer
+
+    def log_message(self, format, *args):
+        pass #one line per request would dominate a benchmark run
+
+    def read_json(self) -> Any:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"null")
+
+    def send_json(self, status: int, body: Any, headers: Optional[Dict[str, str]] = None) -> None:
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class ClockifyHandler(JsonHandler):
+    """Routes of the clockify REST api under /api/v1/workspaces/{workspace_id}."""
+
+    GET_ROUTES = [
+        (re.compile(r"^/users$"), "users"),
+        (re.compile(r"^/projects$"), "projects"),
+        (re.compile(r"^/clients$"), "clients"),
+        (re.compile(r"^/time-entries/status/in-progress$"), "in_progress"),
+        (re.compile(r"^/user/(?P<user_id>[^/]+)/time-entries$"), "user_time_entries"),
+        (re.compile(r"^/projects/(?P<project_id>[^/]+)/tasks$"), "project_tasks"),
+    ]
+    WRITE_ROUTES = re.compile(r"^/(clients|projects)(/[^/]+)?$|^/projects/[^/]+/tasks(/[^/]+)?$")
+
+    def route(self) -> Optional[str]:
+        """Checks the key, the workspace and the rate limit, returns the path inside the workspace (None when answered)."""
+        if not self.headers.get("x-api-key"):
+            self.send_json(401, {"message": "Full authentication is required to access this resource", "code": 1000})
+            return None
+
+        prefix = f"/api/v1/workspaces/{self.server.workspace.workspace_id}"
+        path = urlparse(self.path).path
+        if not path.startswith(prefix):
+            self.send_json(404, {"message": "Workspace not found", "code": 501})
+            return None
+
+        allowed, _, _ = self.server.limiters["requests"].hit()
+        if not allowed:
+            self.send_json(429, {"message": "Too many requests", "code": 429}, {"Retry-After": "1"})
+            return None
+        return path[len(prefix):]
+
+    def do_GET(self):
+        path = self.route()
+        if path is None:
+            return
+
+        workspace = self.server.workspace
+        for pattern, name in self.GET_ROUTES:
+            match = pattern.match(path)
+            if match:
+                break
+        else:
+            self.send_json(404, {"message": "Not found", "code": 404})
+            return
+
+        params = parse_qs(urlparse(self.path).query)
+        if name == "users":
+            records = workspace.clockify_users
+        elif name == "projects":
+            records = workspace.clockify_projects
+        elif name == "clients":
+            records = workspace.clockify_clients
+        elif name == "in_progress":
+            records = workspace.running_entries()
+        elif name == "project_tasks":
+            records = workspace.clockify_tasks.get(match["project_id"], [])
+        else:
+            user = workspace.user_index.get(match["user_id"])
+            records = workspace.time_entries(user) if user is not None else []
+            if "start" in params: #same format on both sides (yyyy-MM-ddThh:mm:ssZ), a string compare is a time compare
+                records = [entry for entry in records if entry["timeInterval"]["start"] >= params["start"][0]]
+
+        page = max(int(params.get("page", ["1"])[0]), 1)
+        page_size = min(max(int(params.get("page-size", [str(self.server.options["default_page_size"])])[0]), 1), 5000)
+        self.send_json(200, records[(page - 1) * page_size:page * page_size])
+
+    def write(self, status: int):
+        path = self.route()
+        if path is None:
+            return
+        if not self.WRITE_ROUTES.match(path):
+            self.send_json(404, {"message": "Not found", "code": 404})
+            return
+
+        body = self.read_json() or {}
+        resource_id = path.rstrip("/").split("/")[-1] if status == 200 else f"{int(time.time() * 1000000):024x}"
+        self.send_json(status, {**body, "id": resource_id, "workspaceId": self.server.workspace.workspace_id})
+
+    def do_POST(self):
+        self.write(201)
+
+    def do_PUT(self):
+        self.write(200)
+
+
+class LinearHandler(JsonHandler):
+    """The POST /graphql endpoint of linear, answering the queries of LinearClient.query_dict."""
+
+    ROOT_FIELD = re.compile(r"\{\s*(\w+)\s*\(")
+    CONNECTION = re.compile(r"(\w+)\s*(?:\(([^)]*)\))?\s*\{\s*nodes\b") #name and arguments of every connection
+    FIRST_ARG = re.compile(r"\bfirst\s*:\s*(\$?\w+)")
+    DEFAULT_FIRST = 50 #nodes linear returns (and charges for) when a connection has no first
+    MAX_COMPLEXITY = 10000 #linear refuses single queries above this
+
+    def connection_first(self, args: Optional[str], variables: Dict[str, Any]) -> int:
+        """The first argument of a connection, a literal or a $variable, DEFAULT_FIRST when it is not given."""
+        match = self.FIRST_ARG.search(args or "")
+        if not match:
+            return self.DEFAULT_FIRST
+        value = match.group(1)
+        value = variables.get(value[1:]) if value.startswith("$") else value
+        return int(value) if value is not None else self.DEFAULT_FIRST
+
+    def truncate_nested(self, node: Dict[str, Any], nested: Dict[str, int]) -> Dict[str, Any]:
+        """A copy of the node whose nested connections hold at most their first nodes, with hasNextPage set like linear."""
+        node = dict(node)
+        for name, first in nested.items():
+            connection = node.get(name)
+            if isinstance(connection, dict) and isinstance(connection.get("nodes"), list):
+                node[name] = {**connection, "nodes": connection["nodes"][:first],
+                              "pageInfo": {"hasNextPage": len(connection["nodes"]) > first}}
+        return node
+
+    def do_POST(self):
+        if urlparse(self.path).path != "/graphql":
+            self.send_json(404, {"errors": [{"message": "Not found"}]})
+            return
+        if not self.headers.get("Authorization"):
+            self.send_json(400, {"errors": [{"message": "Authentication required, not authenticated",
+                                             "extensions": {"code": "AUTHENTICATION_ERROR"}}]})
+            return
+
+        body = self.read_json() or {}
+        query = body.get("query") or ""
+        variables = body.get("variables") or {}
+        match = self.ROOT_FIELD.search(query)
+        name = match.group(1) if match else None
+        nodes = self.server.workspace.linear_nodes.get(name)
+        if nodes is None:
+            self.send_json(400, {"errors": [{"message": f"Cannot query field \"{name}\" on type \"Query\"."}]})
+            return
+
+        first = variables.get("first") or 50
+        if first > 250:
+            self.send_json(400, {"errors": [{"message": "first must be less than or equal to 250"}]})
+            return
+
+        #about how linear scores a query: a point per node, and every node of the page pays for the first
+        #(or 50) nodes of each of its nested connections
+        nested = {name: self.connection_first(args, variables) for name, args in self.CONNECTION.findall(query)[1:]}
+        complexity = first * (1 + sum(nested.values()))
+        if complexity > self.MAX_COMPLEXITY:
+            self.send_json(400, {"errors": [{"message": "Query too complex", "extensions": {"code": "QUERY_TOO_COMPLEX"}}]})
+            return
+
+        requests_ok, requests_left, requests_reset = self.server.limiters["requests"].hit()
+        complexity_ok, complexity_left, complexity_reset = self.server.limiters["complexity"].hit(complexity if requests_ok else 0)
+        headers = {
+            "X-RateLimit-Requests-Limit": str(int(self.server.limiters["requests"].limit)),
+            "X-RateLimit-Requests-Remaining": str(int(requests_left)),
+            "X-RateLimit-Requests-Reset": str(int(requests_reset * 1000)), #unix time in ms
+            "X-Complexity": str(complexity),
+            "X-RateLimit-Complexity-Limit": str(int(self.server.limiters["complexity"].limit)),
+            "X-RateLimit-Complexity-Remaining": str(int(complexity_left)),
+            "X-RateLimit-Complexity-Reset": str(int(complexity_reset * 1000)),
+        }
+        if not (requests_ok and complexity_ok):
+            retry_after = max((requests_reset if not requests_ok else complexity_reset) - time.time(), 1)
+            self.send_json(429, {"errors": [{"message": "Rate limit exceeded", "extensions": {"code": "RATELIMITED"}}]},
+                           {**headers, "Retry-After": str(int(retry_after))})
+            return
+
+        updated_after = (((variables.get("filter") or {}).get("updatedAt") or {}).get("gt"))
+        if updated_after: #the watermarks are utc, comparing yyyy-mm-ddThh:mm:ss strings compares the moments
+            nodes = [node for node in nodes if node["updatedAt"][:19] > updated_after[:19]]
+
+        offset = int(base64.b64decode(variables["after"]).decode()) if variables.get("after") else 0
+        page = nodes[offset:offset + first]
+        end = offset + len(page)
+        if nested:
+            page = [self.truncate_nested(node, nested) for node in page]
+        self.send_json(200, {"data": {name: {
+            "nodes": page,
+            "pageInfo": {"hasNextPage": end < len(nodes), "endCursor": base64.b64encode(str(end).encode()).decode() if page else None},
+        }}}, headers)
+
+
+def start_servers(workspace: SyntheticWorkspace, host: str = "127.0.0.1", clockify_port: int = 0, linear_port: int = 0,
+                  clockify_rate: float = 50, default_page_size: int = 50, linear_requests_per_hour: float = 1500,
+                  linear_complexity_per_hour: float = 250000) -> Tuple[StandInServer, StandInServer]:
+    """
+    Starts both stand-ins on daemon threads of the calling process.
+
+    Args:
+        workspace (SyntheticWorkspace): Data served by both
+        host (str): Interface to bind
+        clockify_port (int): Port of the clockify stand-in, 0 picks a free one
+        linear_port (int): Port of the linear stand-in, 0 picks a free one
+        clockify_rate (float): Clockify requests allowed per second
+        default_page_size (int): Clockify records per page when no page-size is sent
+        linear_requests_per_hour (float): Linear requests allowed per hour
+        linear_complexity_per_hour (float): Linear complexity points allowed per hour
+
+    Returns:
+        Tuple[StandInServer, StandInServer]: The clockify and linear servers (server_address holds the bound port).
+    """
+    clockify = StandInServer((host, clockify_port), ClockifyHandler, workspace, default_page_size=default_page_size)
+    clockify.limiters["requests"] = FixedWindowLimiter(clockify_rate, 1)
+
+    linear = StandInServer((host, linear_port), LinearHandler, workspace)
+    linear.limiters["requests"] = FixedWindowLimiter(linear_requests_per_hour, 3600)
+    linear.limiters["complexity"] = FixedWindowLimiter(linear_complexity_per_hour, 3600)
+
+    clockify.serve_in_thread()
+    linear.serve_in_thread()
+    return clockify, linear
+
+
+def add_workspace_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds the sizes of a SyntheticWorkspace to a parser (shared with the benchmark)."""
+    parser.add_argument("--users", type=int, default=50, help="clockify users")
+    parser.add_argument("--clients", type=int, default=10, help="clockify clients")
+    parser.add_argument("--projects", type=int, default=40, help="clockify projects")
+    parser.add_argument("--tasks-per-project", type=int, default=5, help="clockify tasks of every project")
+    parser.add_argument("--entries-per-user", type=int, default=200, help="clockify time entries of every user")
+    parser.add_argument("--linear-users", type=int, default=50, help="linear users")
+    parser.add_argument("--teams", type=int, default=5, help="linear teams")
+    parser.add_argument("--linear-projects", type=int, default=40, help="linear projects")
+    parser.add_argument("--issues", type=int, default=2000, help="linear issues")
+    parser.add_argument("--cycles", type=int, default=20, help="linear cycles")
+    parser.add_argument("--customers", type=int, default=20, help="linear customers")
+    parser.add_argument("--seed", type=int, default=42, help="seed of the generated data")
+    parser.add_argument("--clockify-rate", type=float, default=50, help="clockify requests per second before a 429")
+    parser.add_argument("--linear-requests-per-hour", type=float, default=1500, help="linear requests per hour before a 429")
+    parser.add_argument("--linear-complexity-per-hour", type=float, default=250000, help="linear complexity points per hour")
+
+
+def workspace_from_args(args: argparse.Namespace) -> SyntheticWorkspace:
+    """Builds the SyntheticWorkspace described by the arguments of add_workspace_arguments."""
+    return SyntheticWorkspace(
+        users=args.users, clients=args.clients, projects=args.projects, tasks_per_project=args.tasks_per_project,
+        entries_per_user=args.entries_per_user, linear_users=args.linear_users, teams=args.teams,
+        linear_projects=args.linear_projects, issues=args.issues, cycles=args.cycles, customers=args.customers, seed=args.seed,
+    )
+
+
+def serve(args: argparse.Namespace, host: str = "127.0.0.1", clockify_port: int = 8801, linear_port: int = 8802) -> None:
+    """Serves the workspace described by args on both stand-ins until interrupted (the benchmark runs this in a child process)."""
+    workspace = workspace_from_args(args)
+    clockify, linear = start_servers(
+        workspace, host, clockify_port, linear_port, clockify_rate=args.clockify_rate,
+        linear_requests_per_hour=args.linear_requests_per_hour, linear_complexity_per_hour=args.linear_complexity_per_hour,
+    )
+    print(f"clockify stand-in: http://{host}:{clockify.server_address[1]}/api/v1 (workspace {workspace.workspace_id})", flush=True)
+    print(f"linear stand-in: http://{host}:{linear.server_address[1]}/graphql", flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        clockify.shutdown()
+        linear.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve synthetic data on stand-ins of the Clockify and Linear APIs.")
+    add_workspace_arguments(parser)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--clockify-port", type=int, default=8801)
+    parser.add_argument("--linear-port", type=int, default=8802)
+    args = parser.parse_args()
+
+    serve(args, args.host, args.clockify_port, args.linear_port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,401 @@
+import random
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Dict, List
+
+"""
+Seeded generator of a fake Clockify workspace and Linear organization, shaped like the API responses the clients
+receive (camelCase keys, nested objects). The same sizes and seed always give the same records, ids keep the
+references between entities valid so the loads pass the foreign keys of linear_schema.
+
+Used by the stand-in servers (benchmarks/standin_servers.py), nothing here talks to the network or the db.
+"""
+
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc) #every generated timestamp falls in the year after this
+
+
+def clockify_id(kind: int, index: int) -> str:
+    """24 hex chars like clockify's ids, kind keeps the ids of different entities apart."""
+    return f"{kind:02x}{index:022x}"
+
+
+def linear_id(kind: int, index: int) -> str:
+    """UUID shaped id like linear's, kind keeps the ids of different entities apart."""
+    return f"{kind:08x}-0000-4000-8000-{index:012x}"
+
+
+def iso(moment: datetime) -> str:
+    """Formats a datetime the way both APIs send it."""
+    return moment.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def iso_duration(duration: timedelta) -> str:
+    """Formats a timedelta the way clockify does (PT#H#M#S)."""
+    hours, rest = divmod(int(duration.total_seconds()), 3600)
+    minutes, seconds = divmod(rest, 60)
+    return "PT" + (f"{hours}H" if hours else "") + (f"{minutes}M" if minutes else "") + (f"{seconds}S" if seconds or not duration else "")
+
+
+class SyntheticWorkspace:
+    """
+    Fake data of both APIs. Small entities are built up front, time entries are built per user on request
+    (and a few users are cached) so a million entries never sit in memory at once.
+    """
+
+    def __init__(self, users: int = 50, clients: int = 10, projects: int = 40, tasks_per_project: int = 5,
+                 entries_per_user: int = 200, linear_users: int = 50, teams: int = 5, linear_projects: int = 40,
+                 issues: int = 2000, cycles: int = 20, customers: int = 20, seed: int = 42, workspace_id: str = "benchmark"):
+        """
+        Args:
+            users (int): Clockify users, every one of them has entries_per_user time entries
+            clients (int): Clockify clients
+            projects (int): Clockify projects
+            tasks_per_project (int): Clockify tasks of every project
+            entries_per_user (int): Clockify time entries of every user
+            linear_users (int): Linear users
+            teams (int): Linear teams
+            linear_projects (int): Linear projects
+            issues (int): Linear issues
+            cycles (int): Linear cycles
+            customers (int): Linear customers
+            seed (int): Seed of every random choice
+            workspace_id (str): Id of the clockify workspace
+        """
+        self.users = users
+        self.clients = clients
+        self.projects = projects
+        self.tasks_per_project = tasks_per_project
+        self.entries_per_user = entries_per_user
+        self.seed = seed
+        self.workspace_id = workspace_id
+        self.linear_sizes = {
+            "users": linear_users, "teams": teams, "projects": linear_projects,
+            "issues": issues, "cycles": cycles, "customers": customers,
+        }
+
+        self.clockify_users = [self._clockify_user(i) for i in range(users)]
+        self.clockify_clients = [self._clockify_client(i) for i in range(clients)]
+        self.clockify_projects = [self._clockify_project(i) for i in range(projects)]
+        self.clockify_tasks = {
+            project["id"]: [self._clockify_task(i, j) for j in range(tasks_per_project)]
+            for i, project in enumerate(self.clockify_projects)
+        }
+        self.user_index = {user["id"]: i for i, user in enumerate(self.clockify_users)}
+
+        builders = {
+            "users": self._linear_user, "teams": self._linear_team, "projects": self._linear_project,
+            "issues": self._linear_issue, "cycles": self._linear_cycle, "customers": self._linear_customer,
+        }
+        self.linear_nodes: Dict[str, List[Dict[str, Any]]] = {
+            name: [builders[name](i) for i in range(size)] for name, size in self.linear_sizes.items()
+        }
+        self.time_entries = lru_cache(maxsize=64)(self._time_entries) #workers page through a handful of users at a time
+
+    def rng(self, *key) -> random.Random:
+        """Random generator of one record, seeded by the workspace seed and the key of the record."""
+        return random.Random("-".join(str(part) for part in (self.seed,) + key))
+
+    def expected_counts(self) -> Dict[str, int]:
+        """Number of records of every entity the ETL should end up loading."""
+        return {
+            "clockify_clients": self.clients,
+            "clockify_users": self.users,
+            "clockify_projects": self.projects,
+            "clockify_tasks": self.projects * self.tasks_per_project,
+            "clockify_time_entries": self.users * self.entries_per_user,
+            **{f"linear_{name}": size for name, size in self.linear_sizes.items()},
+        }
+
+    #clockify
+    def _clockify_user(self, i: int) -> Dict[str, Any]:
+        rng = self.rng("clockify_user", i)
+        return {
+            "id": clockify_id(0xA1, i),
+            "email": f"user{i}@example.com",
+            "name": f"User {i}",
+            "memberships": [],
+            "profilePicture": "",
+            "activeWorkspace": self.workspace_id,
+            "defaultWorkspace": self.workspace_id,
+            "settings": {
+                "weekStart": "MONDAY",
+                "timeZone": rng.choice(["Europe/Berlin", "America/New_York", "Africa/Nairobi"]),
+                "timeFormat": "HOUR24",
+                "dateFormat": "YYYY-MM-DD",
+                "sendNewsletter": False,
+                "weeklyUpdates": rng.random() < 0.5,
+                "longRunning": True,
+                "scheduledReports": True,
+                "approval": True,
+                "pto": True,
+                "alerts": True,
+                "reminders": True,
+                "timeTrackingManual": rng.random() < 0.5,
+                "summaryReportSettings": {"group": "PROJECT", "subgroup": "CLIENT"},
+                "isCompactViewOn": False,
+                "dashboardSelection": "ME",
+                "dashboardViewType": "PROJECT",
+                "dashboardPinToTop": False,
+                "projectListCollapse": 50,
+                "collapseAllProjectLists": False,
+                "groupSimilarEntriesDisabled": False,
+                "myStartOfDay": "09:00",
+                "projectPickerTaskFilter": False,
+                "lang": "EN",
+                "multiFactorEnabled": False,
+                "theme": "DEFAULT",
+                "scheduling": True,
+                "onboarding": False,
+                "showOnlyWorkingDays": False,
+            },
+            "status": "ACTIVE",
+            "customFields": [],
+        }
+
+    def _clockify_client(self, i: int) -> Dict[str, Any]:
+        return {
+            "id": clockify_id(0xC3, i),
+            "name": f"Client {i}",
+            "email": f"client{i}@example.com",
+            "workspaceId": self.workspace_id,
+            "archived": False,
+            "address": f"{i} Main Street",
+            "note": "",
+            "currencyId": clockify_id(0xCC, 0),
+            "currencyCode": "USD",
+        }
+
+    def _clockify_project(self, i: int) -> Dict[str, Any]:
+        rng = self.rng("clockify_project", i)
+        client = rng.randrange(self.clients) if self.clients else None
+        member = rng.randrange(self.users) if self.users else 0
+        return {
+            "id": clockify_id(0xB2, i),
+            "name": f"Project {i}",
+            "hourlyRate": {"amount": rng.choice([0, 5000, 7500]), "currency": "USD"},
+            "clientId": clockify_id(0xC3, client) if client is not None else "",
+            "workspaceId": self.workspace_id,
+            "billable": rng.random() < 0.7,
+            "memberships": [{
+                "userId": clockify_id(0xA1, member),
+                "hourlyRate": {"amount": 5000, "currency": "USD"},
+                "costRate": None,
+                "targetId": clockify_id(0xB2, i),
+                "membershipType": "PROJECT",
+                "membershipStatus": "ACTIVE",
+            }],
+            "color": rng.choice(["#03A9F4", "#8BC34A", "#FF5722"]),
+            "estimate": {"estimate": "PT0S", "type": "AUTO"},
+            "archived": rng.random() < 0.1,
+            "duration": iso_duration(timedelta(minutes=rng.randrange(0, 100000))),
+            "clientName": f"Client {client}" if client is not None else "",
+            "note": "",
+            "costRate": None,
+            "timeEstimate": {"estimate": "PT0S", "type": "AUTO", "resetOption": None, "active": False, "includeNonBillable": True},
+            "budgetEstimate": None,
+            "estimateReset": None,
+            "template": False,
+            "public": rng.random() < 0.5,
+        }
+
+    def _clockify_task(self, project: int, j: int) -> Dict[str, Any]:
+        rng = self.rng("clockify_task", project, j)
+        assignees = [clockify_id(0xA1, rng.randrange(self.users))] if self.users and rng.random() < 0.6 else []
+        return {
+            "id": clockify_id(0xD4, project * max(self.tasks_per_project, 1) + j),
+            "name": f"Task {j} of project {project}",
+            "projectId": clockify_id(0xB2, project),
+            "assigneeIds": assignees,
+            "assigneeId": assignees[0] if assignees else None,
+            "userGroupIds": [],
+            "estimate": "PT0S",
+            "status": rng.choice(["ACTIVE", "DONE"]),
+            "budgetEstimate": 0,
+            "duration": iso_duration(timedelta(minutes=rng.randrange(0, 5000))),
+            "billable": True,
+            "hourlyRate": {"amount": 5000, "currency": "USD"},
+            "costRate": {"amount": 2500, "currency": "USD"},
+        }
+
+    def _time_entries(self, user: int) -> List[Dict[str, Any]]:
+        """Time entries of one user, newest first like clockify. Every tenth user has a timer running."""
+        rng = self.rng("clockify_time_entries", user)
+        user_id = clockify_id(0xA1, user)
+        spacing = 31536000 // max(self.entries_per_user, 1) #spread over the year after EPOCH, no overlaps
+        running_user = user % 10 == 0
+
+        entries = []
+        for j in range(self.entries_per_user):
+            began = EPOCH + timedelta(seconds=j * spacing + rng.randrange(0, max(spacing // 2, 1)))
+            duration = timedelta(seconds=rng.randrange(60, max(spacing // 2, 61)))
+            running = running_user and j == self.entries_per_user - 1
+            project = rng.randrange(self.projects) if self.projects else None
+            task = rng.randrange(self.tasks_per_project) if project is not None and self.tasks_per_project and rng.random() < 0.7 else None
+            entries.append({
+                "id": clockify_id(0xE5, user * self.entries_per_user + j),
+                "description": rng.choice(["", "standup", "review", "feature work"]),
+                "tagIds": rng.choice([[], [clockify_id(0x7A, 0)], [clockify_id(0x7A, 0), clockify_id(0x7A, 1)]]),
+                "userId": user_id,
+                "billable": rng.random() < 0.5,
+                "taskId": clockify_id(0xD4, project * self.tasks_per_project + task) if task is not None else None,
+                "projectId": clockify_id(0xB2, project) if project is not None else None,
+                "workspaceId": self.workspace_id,
+                "customFieldValues": [],
+                "type": "REGULAR",
+                "kioskId": None,
+                "isLocked": False,
+                "timeInterval": {
+                    "start": iso(began),
+                    "end": None if running else iso(began + duration),
+                    "duration": None if running else iso_duration(duration),
+                },
+                "hourlyRate": {"amount": 5000, "currency": "USD"},
+                "costRate": {"amount": 2500, "currency": "USD"},
+            })
+        entries.reverse()
+        return entries
+
+    def running_entries(self) -> List[Dict[str, Any]]:
+        """Entries whose timer is still running (no end), one for every tenth user."""
+        return [
+            entries[0]
+            for user in range(0, self.users, 10)
+            for entries in [self.time_entries(user)]
+            if entries and entries[0]["timeInterval"]["end"] is None
+        ]
+
+    #linear
+    def _updated(self, rng: random.Random) -> Dict[str, str]:
+        created = EPOCH + timedelta(seconds=rng.randrange(0, 15768000))
+        updated = created + timedelta(seconds=rng.randrange(0, 15768000))
+        return {"createdAt": iso(created), "updatedAt": iso(updated)}
+
+    def _ref(self, rng: random.Random, name: str, kind: int, optional: bool = True):
+        """{"id": ...} of a random generated node of another entity (sometimes None when optional)."""
+        size = self.linear_sizes[name]
+        if not size or (optional and rng.random() < 0.2):
+            return None
+        return {"id": linear_id(kind, rng.randrange(size))}
+
+    def _linear_user(self, i: int) -> Dict[str, Any]:
+        rng = self.rng("linear_user", i)
+        return {
+            "id": linear_id(0x11, i),
+            "name": f"Linear User {i}",
+            "email": f"linear{i}@example.com",
+            "description": None,
+            "active": rng.random() < 0.9,
+            "admin": rng.random() < 0.1,
+            "timezone": rng.choice(["Europe/Berlin", "America/New_York", "Africa/Nairobi"]),
+            **self._updated(rng),
+            "archivedAt": None,
+            "statusLabel": rng.choice([None, "On vacation"]),
+            "statusUntilAt": None,
+            "initials": f"U{i % 100}",
+        }
+
+    def _linear_team(self, i: int) -> Dict[str, Any]:
+        rng = self.rng("linear_team", i)
+        users = self.linear_sizes["users"]
+        members = rng.sample(range(users), min(users, rng.randrange(1, 20))) if users else []
+        return {
+            "id": linear_id(0x22, i),
+            "name": f"Team {i}",
+            "description": None,
+            "timezone": "Europe/Berlin",
+            "key": f"T{i}",
+            "cycleStartDay": rng.randrange(7),
+            **self._updated(rng),
+            "archivedAt": None,
+            "members": {"nodes": [{"id": linear_id(0x11, member)} for member in members], "pageInfo": {"hasNextPage": False}},
+        }
+
+    def _linear_project(self, i: int) -> Dict[str, Any]:
+        rng = self.rng("linear_project", i)
+        teams = self.linear_sizes["teams"]
+        project_teams = rng.sample(range(teams), min(teams, rng.randrange(1, 3))) if teams else []
+        lead = self._ref(rng, "users", 0x11)
+        return {
+            "id": linear_id(0x33, i),
+            "creator": self._ref(rng, "users", 0x11, optional=False),
+            "name": f"Linear Project {i}",
+            "scope": rng.randrange(0, 100),
+            "startDate": rng.choice([None, "2024-03-01"]),
+            "startedAt": None,
+            **self._updated(rng),
+            "completedAt": None,
+            "lead": {**lead, "name": "Lead"} if lead else None,
+            "description": "",
+            "priority": rng.randrange(5),
+            "status": {"type": rng.choice(["planned", "started", "completed"])},
+            "teams": {"nodes": [{"id": linear_id(0x22, team), "name": f"Team {team}"} for team in project_teams], "pageInfo": {"hasNextPage": False}},
+        }
+
+    def _linear_issue(self, i: int) -> Dict[str, Any]:
+        rng = self.rng("linear_issue", i)
+        stamps = self._updated(rng)
+        return {
+            "assignee": self._ref(rng, "users", 0x11),
+            "completedAt": rng.choice([None, stamps["updatedAt"]]),
+            "createdAt": stamps["createdAt"],
+            "creator": self._ref(rng, "users", 0x11, optional=False),
+            "id": linear_id(0x44, i),
+            "priority": rng.randrange(5),
+            "project": self._ref(rng, "projects", 0x33),
+            "team": self._ref(rng, "teams", 0x22, optional=False),
+            "dueDate": rng.choice([None, "2024-12-31"]),
+            "estimate": rng.choice([None, 1, 2, 3, 5]),
+            "supervisor": None,
+            "needs": {"nodes": []},
+            "title": f"Issue {i}",
+            "triagedAt": None,
+            "updatedAt": stamps["updatedAt"],
+            "addedToProjectAt": None,
+            "addedToCycleAt": None,
+            "activitySummary": None,
+            "addedToTeamAt": stamps["createdAt"],
+            "delegate": None,
+            "description": rng.choice(["", "Steps to reproduce: ..."]),
+            "startedAt": None,
+            "canceledAt": None,
+            "snoozedUntilAt": None,
+            "snoozedBy": None,
+            "startedTriageAt": None,
+        }
+
+    def _linear_cycle(self, i: int) -> Dict[str, Any]:
+        rng = self.rng("linear_cycle", i)
+        starts = EPOCH + timedelta(weeks=2 * i)
+        return {
+            "completedAt": None,
+            **self._updated(rng),
+            "description": None,
+            "endsAt": iso(starts + timedelta(weeks=2)),
+            "id": linear_id(0x55, i),
+            "isActive": False,
+            "name": f"Cycle {i}",
+            "progress": rng.random(),
+            "number": i + 1,
+            "startsAt": iso(starts),
+            "team": self._ref(rng, "teams", 0x22, optional=False),
+            "issues": {"nodes": []},
+            "progressHistory": [],
+            "scopeHistory": [],
+            "autoArchivedAt": None,
+            "archivedAt": None,
+        }
+
+    def _linear_customer(self, i: int) -> Dict[str, Any]:
+        rng = self.rng("linear_customer", i)
+        return {
+            "id": linear_id(0x66, i),
+            "name": f"Customer {i}",
+            "owner": self._ref(rng, "users", 0x11),
+            "status": {"id": linear_id(0x77, 0)},
+            "tier": None,
+            "revenue": rng.randrange(0, 1000000),
+            "size": rng.randrange(1, 5000),
+            **self._updated(rng),
+            "archivedAt": None,
+            "mainSourceId": None,
+        }
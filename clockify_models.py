@@ -20,6 +20,7 @@ class Client(Base):
     note = Column(String(50))
     currency_id = Column(String(50))
     currency_code = Column(String(50))
+    row_hash = Column(String) #fingerprint of the loaded record, unchanged rows are skipped on upsert
 
 #user class which matches to the users table
 class User(Base):
@@ -65,6 +66,7 @@ class User(Base):
     scheduling = Column(Boolean)
     onboarding = Column(Boolean)
     show_only_working_days = Column(Boolean)
+    row_hash = Column(String)
 
 
 #task class which matches to the tasks table
@@ -89,6 +91,7 @@ class Task(Base):
 
     hourly_rate = Column(Float)
     cost_rate = Column(Float)
+    row_hash = Column(String)
 
 #time entry class which matches to the timestamps table
 class TimeEntry(Base):
@@ -114,6 +117,7 @@ class TimeEntry(Base):
     hourly_rate_currency = Column(String)
     cost_rate_amount = Column(Float)
     cost_rate_currency = Column(String)
+    row_hash = Column(String)
 
 #project class which matches to the base table
 class Project(Base):
@@ -149,4 +153,5 @@ class Project(Base):
     target_id = Column(String)
     membership_type = Column(String)
     membership_status = Column(String)
+    row_hash = Column(String)
 
@@ -1,6 +1,7 @@
 -- Schema creation
 CREATE SCHEMA IF NOT EXISTS clockify_schema;
 CREATE SCHEMA IF NOT EXISTS linear_schema;
+CREATE SCHEMA IF NOT EXISTS etl_schema;
 
 
 -- CLOCKIFY SCHEMA TABLES
@@ -35,7 +36,8 @@ CREATE TABLE clockify_schema.projects (
     hourly_rate FLOAT,
     target_id TEXT,
     membership_type TEXT,
-    membership_status TEXT
+    membership_status TEXT,
+    row_hash TEXT
 );
 
 CREATE TABLE clockify_schema.timestamps (
@@ -57,9 +59,15 @@ CREATE TABLE clockify_schema.timestamps (
     hourly_rate_amount FLOAT,
     hourly_rate_currency TEXT,
     cost_rate_amount FLOAT,
-    cost_rate_currency TEXT
+    cost_rate_currency TEXT,
+    row_hash TEXT
 );
 
+-- the read endpoints filter time entries by user/project and page through them by id
+CREATE INDEX IF NOT EXISTS timestamps_user_id_idx ON clockify_schema.timestamps (user_id, id);
+CREATE INDEX IF NOT EXISTS timestamps_project_id_idx ON clockify_schema.timestamps (project_id, id);
+CREATE INDEX IF NOT EXISTS timestamps_start_idx ON clockify_schema.timestamps (time_interval_start);
+
 CREATE TABLE clockify_schema.users (
     id TEXT PRIMARY KEY,
     email TEXT,
@@ -99,7 +107,8 @@ CREATE TABLE clockify_schema.users (
     theme TEXT,
     scheduling BOOLEAN,
     onboarding BOOLEAN,
-    show_only_working_days BOOLEAN
+    show_only_working_days BOOLEAN,
+    row_hash TEXT
 );
 
 CREATE TABLE clockify_schema.clients (
@@ -111,7 +120,8 @@ CREATE TABLE clockify_schema.clients (
     address TEXT,
     note TEXT,
     currency_id TEXT,
-    currency_code TEXT
+    currency_code TEXT,
+    row_hash TEXT
 );
 
 CREATE TABLE clockify_schema.tasks (
@@ -127,7 +137,8 @@ CREATE TABLE clockify_schema.tasks (
     duration INTERVAL,
     billable BOOLEAN,
     hourly_rate FLOAT,
-    cost_rate FLOAT
+    cost_rate FLOAT,
+    row_hash TEXT
 );
 
 
@@ -148,7 +159,8 @@ CREATE TABLE linear_schema.users (
     archived_at TIMESTAMP,
     status_label VARCHAR,
     status_until_at TIMESTAMP,
-    initials VARCHAR
+    initials VARCHAR,
+    row_hash TEXT
 );
 
 CREATE TABLE linear_schema.projects (
@@ -164,7 +176,8 @@ CREATE TABLE linear_schema.projects (
     lead_id VARCHAR REFERENCES linear_schema.users(id),
     description VARCHAR,
     priority INT,
-    status_type VARCHAR
+    status_type VARCHAR,
+    row_hash TEXT
 );
 
 
@@ -176,21 +189,26 @@ CREATE TABLE linear_schema.teams (
     key VARCHAR,
     cycle_start_day VARCHAR,
     created_at TIMESTAMP,
-    archived_at TIMESTAMP
+    archived_at TIMESTAMP,
+    row_hash TEXT
 );
 
+-- link tables are keyed by the pair itself, so reloading a link upserts it instead of adding a duplicate row
 CREATE TABLE linear_schema.team_members (
-    id SERIAL PRIMARY KEY,
     team_id VARCHAR REFERENCES linear_schema.teams(id),
-    user_id VARCHAR REFERENCES linear_schema.users(id)
+    user_id VARCHAR REFERENCES linear_schema.users(id),
+    PRIMARY KEY (team_id, user_id)
 );
 
 CREATE TABLE linear_schema.team_projects (
-    id SERIAL PRIMARY KEY, 
     team_id VARCHAR REFERENCES linear_schema.teams(id),
-    project_id VARCHAR REFERENCES linear_schema.projects(id)
+    project_id VARCHAR REFERENCES linear_schema.projects(id),
+    PRIMARY KEY (team_id, project_id)
 );
 
+-- reconciliation deletes links by project, the primary key only covers lookups by team
+CREATE INDEX IF NOT EXISTS team_projects_project_id_idx ON linear_schema.team_projects (project_id);
+
 
 
 
@@ -217,7 +235,8 @@ CREATE TABLE linear_schema.issues (
     snoozed_until_at TIMESTAMP,
     added_to_cycle_at TIMESTAMP,
     added_to_project_at TIMESTAMP,
-    added_to_team_at TIMESTAMP
+    added_to_team_at TIMESTAMP,
+    row_hash TEXT
 );
 
 -- CREATE TABLE linear_schema.issue_user_role (
@@ -248,7 +267,8 @@ CREATE TABLE linear_schema.customers (
     createdAt TIMESTAMP,
     updated_at TIMESTAMP,
     archived_at TIMESTAMP,
-    mainSourceId VARCHAR
+    mainSourceId VARCHAR,
+    row_hash TEXT
 );
 
 CREATE TABLE linear_schema.cycles (
@@ -267,7 +287,8 @@ CREATE TABLE linear_schema.cycles (
     completed_at TIMESTAMP,
     auto_archived_at TIMESTAMP,
     archived_at TIMESTAMP,
-    team_id VARCHAR REFERENCES linear_schema.teams(team_id)
+    team_id VARCHAR REFERENCES linear_schema.teams(team_id),
+    row_hash TEXT
 );
 
 CREATE TABLE linear_schema.team_cycles (
@@ -275,3 +296,36 @@ CREATE TABLE linear_schema.team_cycles (
     team_id VARCHAR REFERENCES linear_schema.teams(id),
     cycle_id VARCHAR REFERENCES linear_schema.cycles(id)
 );
+
+
+-- ETL SCHEMA TABLES
+
+
+-- high-water mark per entity for the incremental sync (reset with --full-refresh)
+CREATE TABLE etl_schema.sync_state (
+    entity TEXT PRIMARY KEY,
+    watermark TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ DEFAULT now()
+);
+
+-- bumped by every load that changed rows, the api response cache is invalidated when the sum changes
+CREATE TABLE etl_schema.etl_runs (
+    table_name TEXT PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    loaded_at TIMESTAMPTZ DEFAULT now()
+);
+
+-- one row per flow run: duration, requests, bytes, rows and peak memory, stages has the same numbers per stage and entity
+CREATE TABLE etl_schema.run_summaries (
+    id BIGSERIAL PRIMARY KEY,
+    flow TEXT NOT NULL,
+    started_at TIMESTAMPTZ,
+    finished_at TIMESTAMPTZ,
+    duration_seconds DOUBLE PRECISION,
+    requests BIGINT,
+    bytes_received BIGINT,
+    rows_extracted BIGINT,
+    rows_loaded BIGINT,
+    peak_rss_bytes BIGINT,
+    stages JSONB
+);
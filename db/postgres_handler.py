@@ -1,158 +1,698 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, delete, func, literal_column, make_url, select, tuple_
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.orm import Session as SessionType
 from sqlalchemy.dialects.postgresql import insert
-from typing import Type, Any
+from sqlalchemy.exc import SQLAlchemyError
+from datetime import datetime, timedelta
+from typing import Type, Any, Callable, Dict, Iterable, Iterator, List, Optional
+import io
+import math
+import os
 import pandas as pd
 
 import clockify_models
 import linear_models
+import etl_models
+from utils.entity_specs import MODEL_ENTITIES
+from utils.instrumentation import instrumented
+
+
+class PartialLoadError(RuntimeError):
+    """Raised by insert_to_db after loading every chunk it could, when some chunks were rolled back."""
+
+    def __init__(self, message: str, summary: Dict[str, int]):
+        super().__init__(message)
+        self.summary = summary #inserted, updated, skipped and failed rows of the whole load
+
+
+class PoolSettings:
+    """
+    Connection pool settings of one engine of the handler, see from_env for the variables they are read from.
+    The load and read engines get their own, so a long COPY merge never holds the connections API reads wait for.
+    """
+
+    #attribute -> (variable suffix, parser), e.g. pool_size is DB_READ_POOL_SIZE for the read engine, DB_POOL_SIZE for both
+    ENV_VARIABLES = {
+        "pool_size": ("POOL_SIZE", int),
+        "max_overflow": ("MAX_OVERFLOW", int),
+        "pool_timeout": ("POOL_TIMEOUT", float),
+        "pool_recycle": ("POOL_RECYCLE", int),
+        "pool_pre_ping": ("POOL_PRE_PING", lambda value: value.strip().lower() in ("true", "1", "yes", "on")),
+        "statement_timeout_ms": ("STATEMENT_TIMEOUT_MS", int),
+    }
+    ROLE_ONLY = ("statement_timeout_ms",) #no shared DB_ variable, a limit meant for API reads must never cut a long load short
+
+    def __init__(self, pool_size: int = 5, max_overflow: int = 10, pool_timeout: float = 30.0, pool_recycle: int = 1800,
+                 pool_pre_ping: bool = True, statement_timeout_ms: Optional[int] = None):
+        """
+        Args:
+            pool_size (int): Connections the pool keeps open
+            max_overflow (int): Connections opened on top of pool_size under load, closed again when returned
+            pool_timeout (float): Seconds to wait for a free connection before giving up with a TimeoutError
+            pool_recycle (int): Seconds after which a connection is replaced, before a server or proxy drops it (-1 never)
+            pool_pre_ping (bool): Test every connection on checkout and reconnect if it went stale
+            statement_timeout_ms (Optional[int]): Postgres statement_timeout of the connections, None or 0 for no limit
+        """
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.pool_timeout = pool_timeout
+        self.pool_recycle = pool_recycle
+        self.pool_pre_ping = pool_pre_ping
+        self.statement_timeout_ms = statement_timeout_ms
+
+    @classmethod
+    def from_env(cls, role: str, **defaults) -> "PoolSettings":
+        """
+        Reads the settings of an engine from DB_<ROLE>_<SETTING>, falling back to DB_<SETTING> and then to the defaults,
+        e.g. DB_READ_POOL_SIZE, DB_POOL_SIZE. Settings: POOL_SIZE, MAX_OVERFLOW, POOL_TIMEOUT, POOL_RECYCLE,
+        POOL_PRE_PING and STATEMENT_TIMEOUT_MS, which is only read from DB_<ROLE>_STATEMENT_TIMEOUT_MS.
+
+        Args:
+            role (str): "READ" or "LOAD"
+            **defaults: Defaults of this role that differ from the ones of __init__
+
+        Returns:
+            PoolSettings: The settings.
+        """
+        settings = dict(defaults)
+        for attribute, (suffix, parse) in cls.ENV_VARIABLES.items():
+            value = os.getenv(f"DB_{role.upper()}_{suffix}")
+            if not value and attribute not in cls.ROLE_ONLY:
+                value = os.getenv(f"DB_{suffix}")
+            if value:
+                settings[attribute] = parse(value)
+        return cls(**settings)
+
+    def engine_kwargs(self, db_conn_url: str) -> Dict[str, Any]:
+        """
+        Keyword arguments for create_engine. Only postgres urls get them, other backends (the sqlite runs of the
+        benchmarks) keep the pool SQLAlchemy picks for them.
+
+        Args:
+            db_conn_url (str): The SQLAlchemy connection string the engine is created for.
+
+        Returns:
+            Dict[str, Any]: The pool arguments, and the statement_timeout as a connection option.
+        """
+        if make_url(db_conn_url).get_backend_name() != "postgresql":
+            return {}
+        kwargs = {
+            "pool_size": self.pool_size,
+            "max_overflow": self.max_overflow,
+            "pool_timeout": self.pool_timeout,
+            "pool_recycle": self.pool_recycle,
+            "pool_pre_ping": self.pool_pre_ping,
+        }
+        if self.statement_timeout_ms:
+            kwargs["connect_args"] = {"options": f"-c statement_timeout={int(self.statement_timeout_ms)}"}
+        return kwargs
 
 
 class PostgresHandler:
     """
     Handles PostgreSQL interactions using SQLAlchemy.
     Provides methods to insert DataFrames into database tables, handling conflict resolution on primary keys.
+    Big tables can be loaded through COPY instead of INSERT ... VALUES (see copy_models).
+    Loads and the ETL bookkeeping go through self.engine, the read methods of the API through self.read_engine,
+    each with its own connection pool (see PoolSettings).
     """
 
-    def __init__(self, db_conn_url: str):
+    def __init__(self, db_conn_url: str, copy_models: Optional[Iterable[Type[Any]]] = None, copy_chunk_rows: int = 50000,
+                 batch_size: int = 5000, copy_batch_size: int = 100000, pool: Optional[PoolSettings] = None,
+                 read_pool: Optional[PoolSettings] = None):
         """
-        Initializes the database engine and session factory.
+        Initializes the database engines and session factories, no connection is opened here.
 
         Args:
             db_conn_url (str): The SQLAlchemy connection string to the database.
+            copy_models (Optional[Iterable[Base]]): Model classes loaded with COPY + merge instead of INSERT ... VALUES,
+                defaults to the clockify time entries (by far the biggest table).
+            copy_chunk_rows (int): Number of rows serialized to CSV at a time while streaming a DataFrame through COPY.
+            batch_size (int): Default number of rows upserted per transaction with INSERT ... VALUES.
+            copy_batch_size (int): Default number of rows merged per transaction for the models in copy_models.
+            pool (Optional[PoolSettings]): Pool of the load engine (self.engine), PoolSettings() defaults when None.
+            read_pool (Optional[PoolSettings]): Pool of the read engine (self.read_engine), PoolSettings() defaults when None.
         """
+        self.copy_models = set(copy_models) if copy_models is not None else {clockify_models.TimeEntry}
+        self.copy_chunk_rows = copy_chunk_rows
+        self.batch_size = batch_size
+        self.copy_batch_size = copy_batch_size
+
         #connection creation
         try:
             self.db_conn_url = db_conn_url
-            self.engine = create_engine(self.db_conn_url, echo=False)
+            self.engine = create_engine(self.db_conn_url, echo=False, **(pool or PoolSettings()).engine_kwargs(db_conn_url))
             self.SessionLocal = sessionmaker(bind=self.engine)
+            self.read_engine = create_engine(self.db_conn_url, echo=False, **(read_pool or PoolSettings()).engine_kwargs(db_conn_url))
+            self.ReadSessionLocal = sessionmaker(bind=self.read_engine)
             print("DB connection initialized successfully.")
         except Exception as e:
             print("Failed to initialize DB connection.")
             print(f"Error: {e}")
             raise
 
-    def insert_to_db(self, df: pd.DataFrame, mod_class: Type[Any]) -> bool:
+    @instrumented("load", lambda self, df, mod_class, *args, **kwargs: MODEL_ENTITIES.get(mod_class, mod_class.__table__.fullname),
+                  rows_in=lambda self, df, *args, **kwargs: df)
+    def insert_to_db(self, df: pd.DataFrame, mod_class: Type[Any], batch_size: Optional[int] = None,
+                     progress: Optional[Callable[[str, int, int, Dict[str, int]], None]] = None) -> Dict[str, int]:
         """
         Inserts a DataFrame into a specified database table using SQLAlchemy.
+        The rows are upserted in fixed-size chunks, each in its own transaction, so a bad row only rolls back its chunk.
+        Model classes in self.copy_models are loaded with copy_upsert instead.
 
         Args:
             df (pd.DataFrame): The DataFrame to insert.
             mod_class (Base): SQLAlchemy ORM model class representing the table.
+            batch_size (Optional[int]): Rows per chunk, defaults to self.batch_size (self.copy_batch_size for copy models).
+            progress (Optional[Callable]): Called after every chunk with (model name, chunk number, total chunks, chunk summary).
 
         Returns:
-            bool: True if any rows were affected, False otherwise.
+            Dict[str, int]: Number of rows inserted, updated, skipped (unchanged row_hash) and failed (always 0, see below).
+
+        Raises:
+            PartialLoadError: When chunks were rolled back, after the other chunks were loaded. Its summary holds the
+                counts including the failed rows, so the caller never takes a partial load for a complete one.
         """
-        records = df.to_dict(orient="records")
-        if not records:
-            return False
+        summary = {"inserted": 0, "updated": 0, "skipped": 0, "failed": 0}
+        if not isinstance(df, pd.DataFrame) or df.empty: #transformers return a message dict when there was nothing to transform
+            print(f"No {mod_class.__name__} rows to insert.")
+            return summary
+
+        df = self._with_row_hash(df, mod_class)
+        use_copy = mod_class in self.copy_models
+        batch_size = batch_size or (self.copy_batch_size if use_copy else self.batch_size)
+        total_chunks = math.ceil(len(df) / batch_size)
+
+        for chunk_number, start in enumerate(range(0, len(df), batch_size), start=1):
+            chunk = df.iloc[start:start + batch_size]
+            try:
+                chunk_summary = self.copy_upsert(chunk, mod_class) if use_copy else self._upsert_chunk(chunk, mod_class)
+                chunk_summary["failed"] = 0
+            except (SQLAlchemyError, self.engine.dialect.dbapi.Error) as e: #only this chunk is rolled back, keep loading the rest
+                print(f"Chunk {chunk_number}/{total_chunks} of {mod_class.__name__} was rolled back: {e}")
+                chunk_summary = {"inserted": 0, "updated": 0, "skipped": 0, "failed": len(chunk)}
+
+            for key in summary:
+                summary[key] += chunk_summary[key]
+            if progress:
+                progress(mod_class.__name__, chunk_number, total_chunks, chunk_summary)
+
+        print(
+            f"DB insertion of {mod_class.__name__}: {summary['inserted']} inserted, {summary['updated']} updated, "
+            f"{summary['skipped']} skipped (unchanged), {summary['failed']} failed."
+        )
+        if summary["inserted"] or summary["updated"]: #a load that only skipped unchanged rows leaves cached responses valid
+            self.bump_data_version(mod_class)
+        if summary["failed"]:
+            raise PartialLoadError(f"{summary['failed']} of {len(df)} {mod_class.__name__} rows were rolled back.", summary)
+        return summary
+
+    def _upsert_chunk(self, df: pd.DataFrame, mod_class: Type[Any]) -> Dict[str, int]:
+        """
+        Upserts one chunk of a DataFrame with INSERT ... VALUES ... ON CONFLICT DO UPDATE in a single transaction.
+
+        Args:
+            df (pd.DataFrame): The chunk to upsert.
+            mod_class (Base): SQLAlchemy ORM model class representing the table.
+
+        Returns:
+            Dict[str, int]: Number of rows inserted, updated and skipped.
+        """
+        records = self._null_normalized(df).to_dict(orient="records")
 
         qry = insert(mod_class).values(records)
 
-        # extractiion of all columns to be updated except for the id
+        table = mod_class.__table__
+        key_cols = [col.name for col in table.primary_key.columns] #id, or the (owner, member) pair of a link table
+
+        # extractiion of all columns to be updated except for the key
         updated_cols = {
             col.name: qry.excluded[col.name]
-            for col in mod_class.__table__.columns
-            if col.name != "id"
+            for col in table.columns
+            if col.name not in key_cols
         }
 
-        #when the ids are clasing? update with pleasure!!!
+        #when the ids are clasing? update with pleasure!!! (but only if the row actually changed)
+        changed = table.c.row_hash.is_distinct_from(qry.excluded.row_hash) if "row_hash" in df.columns else None
 
-        qry = qry.on_conflict_do_update(
-            index_elements=['id'],
-            set_=updated_cols
-        )
+        if updated_cols:
+            qry = qry.on_conflict_do_update(index_elements=key_cols, set_=updated_cols, where=changed)
+        else: #link tables are nothing but their key, an existing row is already up to date
+            qry = qry.on_conflict_do_nothing(index_elements=key_cols)
+        qry = qry.returning(literal_column("(xmax = 0)").label("inserted")) #xmax is 0 only for freshly inserted rows
 
         with self.SessionLocal() as session:
-            result = session.execute(qry)
+            inserted_flags = session.execute(qry).scalars().all() #rows skipped by the where clause return nothing
             session.commit()
 
-        if result.rowcount > 0:
-            print("DB insertion of {mod_class.__name__} was a success.")
-            return True
-        else:
-            print("DB insertion of {mod_class.__name__} failed.")
+        inserted = sum(inserted_flags)
+        return {"inserted": inserted, "updated": len(inserted_flags) - inserted, "skipped": len(records) - len(inserted_flags)}
+
+    def copy_upsert(self, df: pd.DataFrame, mod_class: Type[Any]) -> Dict[str, int]:
+        """
+        Bulk loads a DataFrame by streaming it through COPY ... FROM STDIN into a temporary staging table,
+        then merges the staging table into the target with a single INSERT ... SELECT ... ON CONFLICT DO UPDATE.
+        Everything happens in one transaction, insert_to_db calls this once per chunk.
+
+        Args:
+            df (pd.DataFrame): The DataFrame to load.
+            mod_class (Base): SQLAlchemy ORM model class representing the table.
+
+        Returns:
+            Dict[str, int]: Number of rows inserted, updated and skipped.
+        """
+        if not isinstance(df, pd.DataFrame) or df.empty:
+            print(f"No {mod_class.__name__} rows to copy.")
+            return {"inserted": 0, "updated": 0, "skipped": 0}
+
+        preparer = self.engine.dialect.identifier_preparer
+        target = preparer.format_table(mod_class.__table__)
+        stage = preparer.quote(f"stage_{mod_class.__table__.name}")
+        cols = ", ".join(preparer.quote(col) for col in df.columns)
+        updates = ", ".join(f"{preparer.quote(col)} = EXCLUDED.{preparer.quote(col)}" for col in df.columns if col != "id")
+        changed = "WHERE target.row_hash IS DISTINCT FROM EXCLUDED.row_hash" if "row_hash" in df.columns else ""
+
+        merge_qry = f"""
+            WITH merged AS (
+                INSERT INTO {target} AS target ({cols})
+                SELECT DISTINCT ON (id) {cols} FROM {stage} ORDER BY id
+                ON CONFLICT (id) DO UPDATE SET {updates} {changed}
+                RETURNING (xmax = 0) AS inserted
+            )
+            SELECT
+                count(*) FILTER (WHERE inserted),
+                count(*) FILTER (WHERE NOT inserted),
+                (SELECT count(DISTINCT id) FROM {stage}) - count(*)
+            FROM merged
+        """ #distinct on keeps a duplicated id from hitting the same row twice in one statement
+
+        conn = self.engine.raw_connection() #COPY is only available on the raw psycopg2 connection
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(f"CREATE TEMP TABLE {stage} (LIKE {target} INCLUDING DEFAULTS) ON COMMIT DROP")
+
+                for start in range(0, len(df), self.copy_chunk_rows): #only one chunk of csv text is in memory at a time
+                    buffer = io.StringIO()
+                    self._copy_frame(df.iloc[start:start + self.copy_chunk_rows]).to_csv(buffer, index=False, header=False, na_rep="")
+                    buffer.seek(0)
+                    cursor.copy_expert(f"COPY {stage} ({cols}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+                cursor.execute(merge_qry)
+                inserted, updated, skipped = cursor.fetchone()
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            print(f"COPY load of {mod_class.__name__} failed: {e}")
+            raise
+        finally:
+            conn.close()
+
+        return {"inserted": inserted, "updated": updated, "skipped": skipped}
+
+    def _with_row_hash(self, df: pd.DataFrame, mod_class: Type[Any]) -> pd.DataFrame:
+        """
+        Adds a row_hash column (fingerprint of the normalized record) when the table has one.
+        Values are compared as strings with every kind of null collapsed, so dtype noise between runs does not change the hash.
+
+        Args:
+            df (pd.DataFrame): The DataFrame about to be loaded.
+            mod_class (Base): SQLAlchemy ORM model class representing the table.
+
+        Returns:
+            pd.DataFrame: The DataFrame with its row_hash column filled in.
+        """
+        if "row_hash" not in mod_class.__table__.columns:
+            return df
+
+        record_cols = sorted(col for col in df.columns if col != "row_hash") #column order must not change the hash
+        normalized = self._null_normalized(df[record_cols]).astype(str)
+        hashes = pd.util.hash_pandas_object(normalized, index=False) #vectorized 64 bit hash per row
+
+        return df.assign(row_hash=hashes.map("{:016x}".format).to_numpy())
+
+    def _null_normalized(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        The one place where every kind of null (NaN, NaT, NA and empty strings) becomes None, right before rows are
+        serialized for an INSERT (COPY needs no pass, nulls and empty strings are all written as an empty csv field).
+
+        Args:
+            df (pd.DataFrame): The rows about to be serialized.
+
+        Returns:
+            pd.DataFrame: Object columns with None for the nulls.
+        """
+        values = df.astype(object)
+        keep = values.notna()
+        for col in df.columns:
+            if not (pd.api.types.is_numeric_dtype(df[col]) or pd.api.types.is_datetime64_any_dtype(df[col])
+                    or pd.api.types.is_timedelta64_dtype(df[col])): #only text can hold empty strings
+                keep[col] &= values[col].ne("")
+        return values.where(keep, None)
+
+    def _copy_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Makes the values of a DataFrame safe to write as COPY csv, durations are written as seconds
+        because python's "1 day, 2:00:00" is not valid interval input.
+
+        Args:
+            df (pd.DataFrame): A chunk of the DataFrame being copied.
+
+        Returns:
+            pd.DataFrame: The chunk with durations converted.
+        """
+        df = df.copy()
+        for col in df.columns:
+            if pd.api.types.is_timedelta64_dtype(df[col]):
+                df[col] = df[col].dt.total_seconds().map(lambda x: None if pd.isna(x) else f"{x} seconds")
+            elif df[col].dtype == object:
+                df[col] = df[col].map(lambda x: f"{x.total_seconds()} seconds" if isinstance(x, timedelta) else x)
+        return df
 
     
     # all the methods below make use of the method above
 
 
-    def insert_linear_projects(self, df: pd.DataFrame):
+    def link_frame(self, df: pd.DataFrame, nodes_col: str, owner_col: str, member_col: str) -> pd.DataFrame:
+        """
+        Builds the rows of a link table from a column of nested nodes (e.g. the teams of every project), set based:
+        the node lists are exploded to one row per node and the id of every node is pulled out in one pass.
 
-        """Inserts linear projects into a database and also links the project to the teams assigned to it
+        Args:
+            df (pd.DataFrame): Owner rows, with their id and the node lists in nodes_col
+            nodes_col (str): Column holding the list of linked nodes (dicts with an "id") of every owner
+            owner_col (str): Link table column of the owner id
+            member_col (str): Link table column of the node id
+
+        Returns:
+            pd.DataFrame: One (owner_col, member_col) row per distinct link.
+        """
+        links = df[["id", nodes_col]].explode(nodes_col).dropna(subset=[nodes_col]) #empty lists explode to NaN
+        links = pd.DataFrame({owner_col: links["id"], member_col: links[nodes_col].str.get("id")})
+        return links.dropna().drop_duplicates(ignore_index=True) #a duplicated pair would hit the same row twice in one upsert
+
+    def complete_owners(self, df: pd.DataFrame, has_next_col: str, label: str) -> pd.Series:
+        """
+        Ids of the owners whose nested node list came back whole. A nested connection is capped at its first page,
+        so an owner with more links than that would lose the ones past the page if its links were reconciled.
 
         Args:
-            df(pd.DataFrame): a dataframe containing linear projects data
-        
+            df (pd.DataFrame): Owner rows, with their id and the hasNextPage flag of their nested list in has_next_col
+            has_next_col (str): Column holding the hasNextPage flag of every owner
+            label (str): Name of the owners, for the note about the skipped ones
+
+        Returns:
+            pd.Series: The ids of the owners whose links can be reconciled.
         """
-        team_project_list = [] #array that will store a dict of key-value pairs of team_id and project_id
+        truncated = df[has_next_col].fillna(False).astype(bool) if has_next_col in df.columns else pd.Series(False, index=df.index)
+        if truncated.any():
+            print(f"{int(truncated.sum())} {label} have more links than one page holds, their old links are kept: {df.loc[truncated, 'id'].tolist()}")
+        return df.loc[~truncated, "id"]
 
-        for _, row in df.iterrows(): #df rows iteration
-            project_id = row["id"] #extract project id
-            teams_in_project = row["teams_nodes"] #extract the list of teams in a specific project ie row
-            for team in teams_in_project:
-                team_id = team["id"]
-                team_project_list.append({ #appending to array the key-value pairs of the team_id and the project_id
-                    "team_id": team_id,
-                    "project_id": project_id
-                })
+    def reconcile_links(self, mod_class: Type[Any], owner_col: str, owner_ids: Iterable[str], links: pd.DataFrame,
+                        batch_size: int = 1000) -> int:
+        """
+        Deletes the links of the given owners that are not in links anymore (e.g. a member that left a team).
+        Only the owners in owner_ids are touched, so an incremental load never removes the links of owners
+        that were not fetched. Runs in one transaction.
 
+        Args:
+            mod_class (Base): SQLAlchemy ORM model class of the link table
+            owner_col (str): Link table column of the owner id
+            owner_ids (Iterable[str]): Every owner that was loaded, including the ones that have no links left
+            links (pd.DataFrame): The current links of those owners, see link_frame
+            batch_size (int): Owners handled per DELETE statement
 
-        team_project_df = pd.DataFrame(team_project_list) #convert dict to df (consistency purposes of the pipeline (JSOON -> df -> PostgreSQL))
+        Returns:
+            int: Number of links deleted.
+        """
+        table = mod_class.__table__
+        member_col = next(col.name for col in table.primary_key.columns if col.name != owner_col)
+        owner_ids = list(pd.unique(pd.Series(list(owner_ids), dtype=object).dropna()))
 
-        df = df.drop("teams_nodes", axis=1) #remove the teams col in the df (preparation for insertion to db)
+        deleted = 0
+        with self.SessionLocal() as session:
+            for start in range(0, len(owner_ids), batch_size):
+                owners = owner_ids[start:start + batch_size]
+                qry = delete(table).where(table.c[owner_col].in_(owners))
+
+                kept = links[links[owner_col].isin(owners)]
+                if not kept.empty:
+                    qry = qry.where(tuple_(table.c[owner_col], table.c[member_col]).not_in(
+                        list(kept[[owner_col, member_col]].itertuples(index=False, name=None))
+                    ))
+                deleted += session.execute(qry).rowcount
+            session.commit()
 
-        self.insert_to_db(df, linear_models.Project)
-        self.insert_to_db(team_project_df, linear_models.TeamProject)
+        if deleted:
+            print(f"Reconciled {mod_class.__name__}: {deleted} links no longer present were deleted.")
+            self.bump_data_version(mod_class)
+        return deleted
 
-    def insert_linear_teams(self, df: pd.DataFrame):
+    def insert_linear_projects(self, df: pd.DataFrame, batch_size: Optional[int] = None, progress: Optional[Callable] = None):
 
-        """Inserts linear teams into a database and also links the teams to the members in it
+        """Inserts linear projects into a database and also links the project to the teams assigned to it,
+        links of these projects to teams they are no longer assigned to are deleted
+        (only for projects whose teams fit in one page, see complete_owners)
 
         Args:
             df(pd.DataFrame): a dataframe containing linear projects data
+            batch_size(Optional[int]): rows per upsert chunk, see insert_to_db
+            progress(Optional[Callable]): per-chunk progress callback, see insert_to_db
         
         """
-        team_members_list = [] #array to store key-value pairs of a member and the team they belong to
+        if not isinstance(df, pd.DataFrame) or df.empty:
+            print("No linear projects to insert.")
+            return
+
+        team_project_df = self.link_frame(df, "teams_nodes", "project_id", "team_id")
+        complete = self.complete_owners(df, "teams_page_info_has_next_page", "projects")
+
+        df = df.drop(["teams_nodes", "teams_page_info_has_next_page"], axis=1, errors="ignore") #remove the teams cols in the df (preparation for insertion to db)
 
-        for _, row in df.iterrows(): #rows of the df itteration
-            team_id = row["id"] #extract team id
-            users_in_team = row["members_nodes"] #extract users in a specific team
+        self.insert_to_db(df, linear_models.Project, batch_size=batch_size, progress=progress)
+        self.insert_to_db(team_project_df, linear_models.TeamProject, batch_size=batch_size, progress=progress)
+        self.reconcile_links(linear_models.TeamProject, "project_id", complete, team_project_df)
+
+    def insert_linear_teams(self, df: pd.DataFrame, batch_size: Optional[int] = None, progress: Optional[Callable] = None):
+
+        """Inserts linear teams into a database and also links the teams to the members in it,
+        memberships of these teams that are no longer present are deleted
+        (only for teams whose members fit in one page, see complete_owners)
+
+        Args:
+            df(pd.DataFrame): a dataframe containing linear teams data
+            batch_size(Optional[int]): rows per upsert chunk, see insert_to_db
+            progress(Optional[Callable]): per-chunk progress callback, see insert_to_db
+        
+        """
+        if not isinstance(df, pd.DataFrame) or df.empty:
+            print("No linear teams to insert.")
+            return
 
-            for user in users_in_team: 
-                user_id = user["id"]
-                team_members_list.append({ #append key value pair of user_id and team_id
-                    "user_id" : user_id, 
-                    "team_id" : team_id
-                })
-        team_users_df = pd.DataFrame(team_members_list)
+        team_users_df = self.link_frame(df, "members_nodes", "team_id", "user_id")
+        complete = self.complete_owners(df, "members_page_info_has_next_page", "teams")
 
-        df = df.drop("members_nodes", axis=1) #
+        df = df.drop(["members_nodes", "members_page_info_has_next_page"], axis=1, errors="ignore")
 
-        self.insert_to_db(df, linear_models.Team) #db insertion in the teams table in the linear_schema
+        self.insert_to_db(df, linear_models.Team, batch_size=batch_size, progress=progress) #db insertion in the teams table in the linear_schema
 
-        self.insert_to_db(team_users_df, linear_models.TeamMember)
+        self.insert_to_db(team_users_df, linear_models.TeamMember, batch_size=batch_size, progress=progress)
+        self.reconcile_links(linear_models.TeamMember, "team_id", complete, team_users_df)
 
     ###############################################################################################################
-    """These are methods to get data from the db."""
+    """These are methods to keep track of the incremental sync (high-water marks per entity)."""
+
+    def get_watermark(self, entity: str) -> Optional[datetime]:
+        """
+        Gets the high-water mark stored for an entity.
+
+        Args:
+            entity (str): Name of the synced entity (e.g. "linear_issues").
 
-    def get_all_as_dicts(self, model_class):
+        Returns:
+            Optional[datetime]: The stored watermark, or None if the entity was never synced.
+        """
         with self.SessionLocal() as session:
-            records = session.query(model_class).all()
-            return [
-                {column.name: getattr(record, column.name) for column in model_class.__table__.columns}
-                for record in records
-            ]
+            state = session.get(etl_models.SyncState, entity)
+            return state.watermark if state else None
+
+    def set_watermark(self, entity: str, watermark: Optional[datetime]) -> None:
+        """
+        Stores the high-water mark of an entity, a None watermark leaves the stored one untouched.
+
+        Args:
+            entity (str): Name of the synced entity.
+            watermark (Optional[datetime]): Newest timestamp that was loaded for the entity.
+        """
+        if watermark is None: #nothing new was loaded, keep the previous mark
+            return
+
+        qry = insert(etl_models.SyncState).values(entity=entity, watermark=watermark)
+        qry = qry.on_conflict_do_update(
+            index_elements=["entity"],
+            set_={"watermark": qry.excluded.watermark, "updated_at": datetime.now().astimezone()}
+        )
+
+        with self.SessionLocal() as session:
+            session.execute(qry)
+            session.commit()
+        print(f"Watermark of {entity} moved to {watermark}.")
+
+    def reset_watermarks(self, entities: Optional[Iterable[str]] = None) -> None:
+        """
+        Removes stored high-water marks so the next run does a full refresh.
+
+        Args:
+            entities (Optional[Iterable[str]]): Entities to reset, all of them when None.
+        """
+        qry = delete(etl_models.SyncState)
+        if entities is not None:
+            qry = qry.where(etl_models.SyncState.entity.in_(list(entities)))
+
+        with self.SessionLocal() as session:
+            session.execute(qry)
+            session.commit()
+        print("Watermarks reset, next sync will be a full refresh.")
+
+    def bump_data_version(self, mod_class: Type[Any]) -> None:
+        """
+        Counts a committed load of a table in etl_schema.etl_runs, which invalidates the api response cache.
+        A failure is only printed, the data is already loaded and cached responses still expire with their TTL.
+
+        Args:
+            mod_class (Base): SQLAlchemy ORM model class of the loaded table.
+        """
+        qry = insert(etl_models.EtlRun).values(table_name=mod_class.__table__.fullname, version=1)
+        qry = qry.on_conflict_do_update(
+            index_elements=["table_name"],
+            set_={"version": etl_models.EtlRun.version + 1, "loaded_at": func.now()}
+        )
+
+        try:
+            with self.SessionLocal() as session:
+                session.execute(qry)
+                session.commit()
+        except SQLAlchemyError as e:
+            print(f"Failed to bump the data version of {mod_class.__name__}: {e}")
+
+    def save_run_summary(self, summary: Dict[str, Any]) -> None:
+        """
+        Stores the summary of a flow run in etl_schema.run_summaries.
+        A failure is only printed, the run itself already finished.
+
+        Args:
+            summary (Dict[str, Any]): The summary returned by utils.instrumentation.finish_run.
+        """
+        try:
+            with self.SessionLocal() as session:
+                session.execute(insert(etl_models.RunSummary).values(**summary))
+                session.commit()
+        except SQLAlchemyError as e:
+            print(f"Failed to save the run summary of {summary.get('flow')}: {e}")
+
+    def dispose(self) -> None:
+        """Closes the pooled connections of both engines."""
+        self.engine.dispose()
+        self.read_engine.dispose()
+
+    def get_data_version(self) -> Optional[int]:
+        """
+        Gets the data version, the number of committed loads over all tables.
+
+        Returns:
+            Optional[int]: The version, or None when the db could not be reached.
+        """
+        try:
+            with self.read_engine.connect() as conn:
+                return int(conn.execute(select(func.coalesce(func.sum(etl_models.EtlRun.version), 0))).scalar_one()) #sum() of a bigint is a numeric
+        except SQLAlchemyError as e:
+            print(f"Failed to get the data version: {e}")
+            return None
+
+    ###############################################################################################################
+    """These are methods to get data from the db."""
+
+    def get_all_as_dicts(self, model_class, columns: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Gets every row of a table as dicts.
+        Runs a Core select and returns its mappings, rows never become ORM objects (no identity map, no attribute instrumentation).
+
+        Args:
+            model_class (Base): SQLAlchemy ORM model class representing the table.
+            columns (Optional[Iterable[str]]): Names of the columns to select, all of them when None.
+
+        Returns:
+            List[Dict[str, Any]]: The rows as dicts keyed by column name.
+        """
+        table = model_class.__table__
+        qry = select(*(table.c[name] for name in columns)) if columns else select(table)
+
+        with self.read_engine.connect() as conn:
+            return [dict(row) for row in conn.execute(qry).mappings()]
         
     def get_one_as_dict_or_fail(self, model_class, record_id):
-        with self.SessionLocal() as session:
+        with self.ReadSessionLocal() as session:
             record = session.query(model_class).get(record_id)
             if not record:
                 raise ValueError(f"No {model_class.__name__} found with id {record_id}")
             return {column.name: getattr(record, column.name) for column in model_class.__table__.columns}
 
+    def query_page(self, model_class, limit: int = 100, after_id: Optional[str] = None, filters: Optional[Dict[str, Any]] = None,
+                   date_column: Optional[str] = None, start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """
+        Gets one page of rows ordered by id, with the filters applied in SQL.
+        Keyset pagination: the next page starts after the last id of the previous one, so deep pages cost the same as the first.
+
+        Args:
+            model_class (Base): SQLAlchemy ORM model class representing the table.
+            limit (int): Max number of rows returned.
+            after_id (Optional[str]): Only rows with an id greater than this one are returned (the last id of the previous page).
+            filters (Optional[Dict[str, Any]]): Column name -> value equality filters, None values are ignored.
+            date_column (Optional[str]): Column the start/end range applies to.
+            start (Optional[datetime]): Only rows with date_column at or after this moment are returned.
+            end (Optional[datetime]): Only rows with date_column before this moment are returned.
+
+        Returns:
+            List[Dict[str, Any]]: The rows of the page as dicts.
+        """
+        table = model_class.__table__
+        qry = select(table)
+        for column_name, value in (filters or {}).items():
+            if value is not None:
+                qry = qry.where(table.c[column_name] == value)
+        if date_column is not None:
+            if start is not None:
+                qry = qry.where(table.c[date_column] >= start)
+            if end is not None:
+                qry = qry.where(table.c[date_column] < end)
+        if after_id is not None:
+            qry = qry.where(table.c.id > after_id)
+        qry = qry.order_by(table.c.id).limit(limit)
 
+        with self.read_engine.connect() as conn:
+            return [dict(row) for row in conn.execute(qry).mappings()]
+
+
+
+
+
+    def stream_rows(self, model_class, batch_size: int = 5000) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Streams every row of a table in batches through a server side cursor, so only one batch is held in memory
+        no matter how big the table is. The connection stays open until the generator is exhausted or closed.
+
+        Args:
+            model_class (Base): SQLAlchemy ORM model class representing the table.
+            batch_size (int): Rows fetched from the cursor (and yielded) at a time.
+
+        Yields:
+            List[Dict[str, Any]]: A batch of rows as dicts.
+        """
+        qry = select(model_class.__table__)
+        with self.read_engine.connect() as conn:
+            result = conn.execution_options(stream_results=True, yield_per=batch_size).execute(qry) #named cursor on psycopg2
+            for partition in result.mappings().partitions():
+                yield [dict(row) for row in partition]
 
 
 
@@ -0,0 +1,45 @@
+from sqlalchemy import Column, String, BigInteger, Float, TIMESTAMP, func
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.declarative import declarative_base
+
+Base = declarative_base()
+
+#represents the bookkeeping tables the ETL itself uses (not data from clockify or linear)
+
+
+#high-water mark of an entity, used by the incremental sync of the prefect flows
+class SyncState(Base):
+    __tablename__ = "sync_state"
+    __table_args__ = {'schema': 'etl_schema'}
+
+    entity = Column(String, primary_key=True)
+    watermark = Column(TIMESTAMP(timezone=True))
+    updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+#number of committed loads per table, the api uses the sum as the data version its response cache is invalidated by
+class EtlRun(Base):
+    __tablename__ = "etl_runs"
+    __table_args__ = {'schema': 'etl_schema'}
+
+    table_name = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    loaded_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+#one row per flow run with the totals of its instrumented stages (utils/instrumentation.py), stages holds the per entity numbers
+class RunSummary(Base):
+    __tablename__ = "run_summaries"
+    __table_args__ = {'schema': 'etl_schema'}
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    flow = Column(String, nullable=False)
+    started_at = Column(TIMESTAMP(timezone=True))
+    finished_at = Column(TIMESTAMP(timezone=True))
+    duration_seconds = Column(Float)
+    requests = Column(BigInteger)
+    bytes_received = Column(BigInteger)
+    rows_extracted = Column(BigInteger)
+    rows_loaded = Column(BigInteger)
+    peak_rss_bytes = Column(BigInteger)
+    stages = Column(JSONB)
@@ -21,6 +21,7 @@ class User(Base):
     status_label = Column(String())
     status_until_at = Column(TIMESTAMP())
     initials = Column(String())
+    row_hash = Column(String) #fingerprint of the loaded record, unchanged rows are skipped on upsert
 
 class Customer(Base):
     __tablename__ = 'customers'
@@ -37,6 +38,7 @@ class Customer(Base):
     updated_at = Column(TIMESTAMP)
     archived_at = Column(TIMESTAMP)
     main_source_id = Column(String)
+    row_hash = Column(String)
 
 class Team(Base):
     __tablename__ = 'teams'
@@ -50,6 +52,7 @@ class Team(Base):
     cycle_start_day = Column(String)
     created_at = Column(TIMESTAMP)
     archived_at = Column(TIMESTAMP)
+    row_hash = Column(String)
 
 
 class Project(Base):
@@ -66,8 +69,9 @@ class Project(Base):
     completed_at = Column(TIMESTAMP)
     lead_id = Column(String, ForeignKey("users.id"))
     description = Column(String)
-    priority = Column(TIMESTAMP)
+    priority = Column(Integer)
     status_type = Column(String)
+    row_hash = Column(String)
 
 
 class Cycle(Base):
@@ -90,6 +94,7 @@ class Cycle(Base):
     auto_archived_at = Column(TIMESTAMP)
     archived_at = Column(TIMESTAMP)
     team_id = Column(String, ForeignKey("teams.id"))
+    row_hash = Column(String)
 
 
 class Issue(Base):
@@ -118,6 +123,7 @@ class Issue(Base):
     added_to_cycle_at = Column(TIMESTAMP)
     added_to_project_at = Column(TIMESTAMP)
     added_to_team_at = Column(TIMESTAMP)
+    row_hash = Column(String)
 
 class IssueUserRole(Base):
     __tablename__ = 'issue_user_role'
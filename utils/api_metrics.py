@@ -0,0 +1,151 @@
+import time
+
+from prometheus_client import CollectorRegistry, Gauge, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from sqlalchemy import event
+from starlette.routing import Match
+
+from utils.response_cache import ResponseCache
+
+#operational metrics of the FastAPI service, scraped from its /metrics route: latency and in-flight requests per route,
+#how long db connections are held, the latency of the calls made to clockify/linear and the response cache counters.
+#every worker process keeps its own numbers, prometheus adds up the scraped instances
+
+API_REGISTRY = CollectorRegistry() #kept apart from the ETL metrics (utils/instrumentation.py), those are pushed, these are scraped
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+REQUEST_SECONDS = Histogram(
+    "api_request_duration_seconds", "Time from receiving a request to returning its response (streamed bodies excluded)",
+    ["method", "route", "status"], registry=API_REGISTRY, buckets=LATENCY_BUCKETS,
+)
+IN_FLIGHT = Gauge("api_requests_in_flight", "Requests being handled right now", ["method", "route"], registry=API_REGISTRY)
+POOL_HELD_SECONDS = Histogram(
+    "api_db_pool_connection_held_seconds", "Time from checking a connection out of the SQLAlchemy pool to returning it",
+    ["pool"], registry=API_REGISTRY, buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5, 30),
+)
+OUTBOUND_SECONDS = Histogram(
+    "api_outbound_request_duration_seconds", "Latency of the requests sent to the clockify/linear APIs, retries included",
+    ["service", "method", "endpoint", "outcome"], registry=API_REGISTRY, buckets=LATENCY_BUCKETS,
+)
+
+UNMATCHED_ROUTE = "unmatched" #label of requests no route matched, so random paths do not create a series each
+_collectors = {} #(kind, name) -> registered collector, an app started again (tests) replaces its collectors
+
+
+def route_label(app, scope) -> str:
+    """
+    Path template of the route a request goes to (e.g. /export/{source}/{table}), so the latency series do not split per id.
+
+    Args:
+        app (FastAPI): The app whose routes are matched
+        scope (dict): ASGI scope of the request
+
+    Returns:
+        str: The template of the matched route, or UNMATCHED_ROUTE.
+    """
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return UNMATCHED_ROUTE
+
+
+def observe_outbound(service: str, method: str, endpoint: str, started: float, outcome: str) -> None:
+    """
+    Records the latency of one call to a remote API (called by the async clients).
+
+    Args:
+        service (str): "clockify" or "linear"
+        method (str): HTTP method
+        endpoint (str): Url key (clockify data_type) or linear query name
+        started (float): time.perf_counter() taken before the call
+        outcome (str): Status code of the response, or "error" when none came back
+    """
+    OUTBOUND_SECONDS.labels(service, method, endpoint, outcome).observe(time.perf_counter() - started)
+
+
+def observe_pool(engine, name: str) -> None:
+    """
+    Times how long every connection of an engine's pool is checked out into POOL_HELD_SECONDS and exports the pool's
+    size, checked out and overflow connections. Requests wait for a connection when checked out reaches the size plus
+    max_overflow, SQLAlchemy has no event before a checkout to time the wait itself. The listeners are set on the engine,
+    so they carry over to the new pool of engine.dispose().
+
+    Args:
+        engine (Engine): The SQLAlchemy engine to watch
+        name (str): Value of the pool label
+    """
+    held = POOL_HELD_SECONDS.labels(name)
+
+    def checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checked_out_at"] = time.perf_counter()
+
+    def checkin(dbapi_connection, connection_record):
+        started = connection_record.info.pop("checked_out_at", None)
+        if started is not None: #checked out before the listeners were set
+            held.observe(time.perf_counter() - started)
+
+    event.listen(engine, "checkout", checkout)
+    event.listen(engine, "checkin", checkin)
+    _register(("pool", name), PoolCollector(engine, name))
+
+
+class PoolCollector:
+    """Reads the connection counts of an engine's pool when /metrics is scraped."""
+
+    def __init__(self, engine, name: str):
+        self.engine = engine
+        self.name = name
+
+    def collect(self):
+        pool = self.engine.pool
+        for metric, description, method in (
+            ("api_db_pool_size", "Connections the pool keeps open", "size"),
+            ("api_db_pool_checked_out", "Connections in use right now", "checkedout"),
+            ("api_db_pool_overflow", "Connections opened above the pool size (negative while the pool is not full yet)", "overflow"),
+        ):
+            if hasattr(pool, method): #only the queue pool has a size and overflow
+                family = GaugeMetricFamily(metric, description, labels=["pool"])
+                family.add_metric([self.name], getattr(pool, method)())
+                yield family
+
+
+class CacheCollector:
+    """Reads the hit and miss counters of a ResponseCache when /metrics is scraped."""
+
+    def __init__(self, cache: ResponseCache, name: str = "responses"):
+        self.cache = cache
+        self.name = name
+
+    def collect(self):
+        hits, misses = self.cache.hits, self.cache.misses
+        for metric, description, value in (
+            ("api_cache_hits", "Lookups served from the cache", hits),
+            ("api_cache_misses", "Lookups that missed the cache (absent, stale or expired)", misses),
+        ):
+            family = CounterMetricFamily(metric, description, labels=["cache"])
+            family.add_metric([self.name], value)
+            yield family
+
+        ratio = GaugeMetricFamily("api_cache_hit_ratio", "Hits over all lookups since the process started", labels=["cache"])
+        ratio.add_metric([self.name], hits / (hits + misses) if hits + misses else 0.0)
+        yield ratio
+
+        entries = GaugeMetricFamily("api_cache_entries", "Entries held by the cache", labels=["cache"])
+        entries.add_metric([self.name], len(self.cache.entries))
+        yield entries
+
+
+def observe_cache(cache: ResponseCache, name: str = "responses") -> None:
+    """Exports the counters of a ResponseCache under the given cache label."""
+    _register(("cache", name), CacheCollector(cache, name))
+
+
+def _register(key, collector) -> None:
+    previous = _collectors.pop(key, None)
+    if previous is not None:
+        API_REGISTRY.unregister(previous)
+    API_REGISTRY.register(collector)
+    _collectors[key] = collector
+
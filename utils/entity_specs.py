@@ -0,0 +1,84 @@
+from typing import Any, Dict, List, Optional, Sequence, Type
+
+from sqlalchemy import Boolean, DateTime, Float, Integer, Interval
+
+import clockify_models
+import linear_models
+
+#represents how the raw json of every entity becomes the columns of its table, the Transformer runs these specs
+
+
+class EntitySpec:
+    """
+    Declarative description of the transform of one entity.
+    The output columns and their types come from the model, the spec only holds what the model can not tell:
+    how raw field names map to columns and which raw values need reshaping.
+    """
+
+    def __init__(self, model: Type[Any], rename: Optional[Dict[str, str]] = None, strip: Sequence[str] = (),
+                 list_columns: Sequence[str] = (), first_item: Optional[Dict[str, Dict[str, str]]] = None,
+                 keep: Sequence[str] = ()):
+        """
+        Args:
+            model (Base): SQLAlchemy ORM model class of the table the entity is loaded into
+            rename (Optional[Dict[str, str]]): snake_case name -> column, for names camel_to_snake does not get right
+                (when both exist the renamed values only fill the nulls of the column)
+            strip (Sequence[str]): Substrings removed from the raw (json_normalize) names before the snake_case conversion
+            list_columns (Sequence[str]): Columns holding lists, stored as their string (an empty list is a null)
+            first_item (Optional[Dict[str, Dict[str, str]]]): Raw list column -> {field of its first item: column},
+                for nested lists whose first item is flattened into the row
+            keep (Sequence[str]): Extra columns that are not in the table but are passed on (e.g. nodes for the link tables)
+        """
+        self.model = model
+        self.rename = rename or {}
+        self.strip = tuple(strip)
+        self.list_columns = tuple(list_columns)
+        self.first_item = first_item or {}
+        self.keep = tuple(keep)
+
+        table_columns = [column for column in model.__table__.columns if column.name != "row_hash"] #the handler adds the hash
+        self.columns: List[str] = [column.name for column in table_columns] + list(self.keep) #output columns, in table order
+        self.datetime_columns = {column.name: bool(column.type.timezone) for column in table_columns if isinstance(column.type, DateTime)}
+        self.duration_columns = [column.name for column in table_columns if isinstance(column.type, Interval)]
+        self.float_columns = [column.name for column in table_columns if isinstance(column.type, Float)]
+        self.integer_columns = [column.name for column in table_columns if isinstance(column.type, Integer)]
+        self.boolean_columns = [column.name for column in table_columns if isinstance(column.type, Boolean)]
+
+
+ENTITY_SPECS: Dict[str, EntitySpec] = {
+    "clockify_clients": EntitySpec(clockify_models.Client),
+    "clockify_users": EntitySpec(
+        clockify_models.User,
+        strip=("settings_", "ReportSettings"), #nested settings, the prefixes only make the names longer
+        list_columns=("memberships", "custom_fields"),
+    ),
+    "clockify_projects": EntitySpec(
+        clockify_models.Project,
+        first_item={"memberships": {
+            "userId": "user_id",
+            "hourlyRate_amount": "hourly_rate",
+            "targetId": "target_id",
+            "membershipType": "membership_type",
+            "membershipStatus": "membership_status",
+        }},
+    ),
+    "clockify_tasks": EntitySpec(
+        clockify_models.Task,
+        rename={"hourly_rate_amount": "hourly_rate", "cost_rate_amount": "cost_rate"},
+        list_columns=("assignee_ids", "user_group_ids"),
+    ),
+    "clockify_time_entries": EntitySpec(
+        clockify_models.TimeEntry,
+        rename={"type": "type_my"},
+        list_columns=("tag_ids", "custom_field_values"),
+    ),
+    "linear_customers": EntitySpec(linear_models.Customer),
+    "linear_users": EntitySpec(linear_models.User),
+    "linear_projects": EntitySpec(linear_models.Project, keep=("teams_nodes", "teams_page_info_has_next_page")), #they feed team_projects
+    "linear_issues": EntitySpec(linear_models.Issue),
+    "linear_cycles": EntitySpec(linear_models.Cycle),
+    "linear_teams": EntitySpec(linear_models.Team, keep=("members_nodes", "members_page_info_has_next_page")), #they feed team_members
+}
+
+#model -> entity name, the loads are reported under the same names as the transforms
+MODEL_ENTITIES: Dict[Type[Any], str] = {spec.model: name for name, spec in ENTITY_SPECS.items()}
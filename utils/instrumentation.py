@@ -0,0 +1,265 @@
+import os
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from functools import wraps
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import pandas as pd
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, push_to_gateway
+
+#structured timing of the ETL stages: every extract (client get_data), transform (Transformer.transform) and load
+#(PostgresHandler.insert_to_db) call is measured by the instrumented decorator, the numbers go to prometheus metrics
+#(pushed to a pushgateway at the end of a flow run, see push_metrics) and into the summary of the current run
+
+REGISTRY = CollectorRegistry() #only the ETL metrics, so a push never carries the default process collectors
+
+STAGE_SECONDS = Histogram(
+    "etl_stage_duration_seconds", "Duration of one extract/transform/load call", ["stage", "entity"], registry=REGISTRY,
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600),
+)
+REQUESTS = Counter("etl_api_requests_total", "HTTP requests sent to the source APIs", ["stage", "entity"], registry=REGISTRY)
+RESPONSE_BYTES = Counter("etl_api_response_bytes_total", "Body bytes received from the source APIs", ["stage", "entity"], registry=REGISTRY)
+ROWS_IN = Counter("etl_stage_rows_in_total", "Rows handed to a stage", ["stage", "entity"], registry=REGISTRY)
+ROWS_OUT = Counter("etl_stage_rows_out_total", "Rows a stage produced (records fetched, rows transformed, rows loaded)", ["stage", "entity"], registry=REGISTRY)
+PEAK_RSS = Gauge("etl_stage_peak_rss_bytes", "Peak resident memory of the process while a stage ran, over the last run", ["stage", "entity"], registry=REGISTRY)
+
+PAGE_BYTES = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss() -> Optional[int]:
+    """Resident memory of this process in bytes, None where /proc is not available."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * PAGE_BYTES
+    except OSError:
+        return None
+
+
+class MemorySampler:
+    """
+    One background thread that samples the resident memory while any instrumented call is running and keeps
+    the peak of every running call. Stages of a flow run concurrently in one process, so a peak is the memory of
+    the whole process while the call ran, not memory the call allocated itself.
+    """
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peaks: Dict[int, int] = {} #token -> peak of a running call
+        self.lock = threading.Lock()
+        self.thread: Optional[threading.Thread] = None
+        self.next_token = 0
+
+    def start(self) -> int:
+        """Starts tracking a call, returns the token stop() takes."""
+        rss = current_rss()
+        with self.lock:
+            self.next_token += 1
+            self.peaks[self.next_token] = rss or 0
+            if self.thread is None and rss is not None: #without /proc there is nothing to sample
+                self.thread = threading.Thread(target=self._run, daemon=True)
+                self.thread.start()
+            return self.next_token
+
+    def stop(self, token: int) -> int:
+        """Stops tracking a call and returns its peak in bytes."""
+        rss = current_rss() or 0
+        with self.lock:
+            return max(self.peaks.pop(token, 0), rss)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            rss = current_rss() or 0
+            with self.lock:
+                if not self.peaks: #nothing running, the next start() spins up a new thread
+                    self.thread = None
+                    return
+                for token, peak in self.peaks.items():
+                    if rss > peak:
+                        self.peaks[token] = rss
+
+
+class CallStats:
+    """Requests and bytes of the instrumented call running in the current thread, filled by count_response."""
+
+    __slots__ = ("requests", "bytes")
+
+    def __init__(self):
+        self.requests = 0
+        self.bytes = 0
+
+
+class RunStats:
+    """Totals of one flow run per (stage, entity), summarized by finish() into the row stored in etl_schema.run_summaries."""
+
+    def __init__(self, flow: str):
+        self.flow = flow
+        self.started_at = datetime.now(timezone.utc)
+        self.stages: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self.lock = threading.Lock()
+
+    def add(self, stage: str, entity: str, started: float, seconds: float, requests: int, nbytes: int,
+            rows_in: int, rows_out: int, peak_rss: int) -> None:
+        with self.lock:
+            totals = self.stages.setdefault((stage, entity), {
+                "stage": stage, "entity": entity, "calls": 0, "seconds": 0.0, "first_started": started, "last_finished": 0.0,
+                "requests": 0, "bytes": 0, "rows_in": 0, "rows_out": 0, "peak_rss_bytes": 0,
+            })
+            totals["calls"] += 1
+            totals["seconds"] += seconds #busy time, concurrent calls (e.g. pages of different users) add up
+            totals["first_started"] = min(totals["first_started"], started)
+            totals["last_finished"] = max(totals["last_finished"], started + seconds)
+            totals["requests"] += requests
+            totals["bytes"] += nbytes
+            totals["rows_in"] += rows_in
+            totals["rows_out"] += rows_out
+            totals["peak_rss_bytes"] = max(totals["peak_rss_bytes"], peak_rss)
+
+    def finish(self) -> Dict[str, Any]:
+        """
+        Summarizes the run.
+
+        Returns:
+            Dict[str, Any]: Totals of the run and a list with the totals of every (stage, entity).
+        """
+        finished_at = datetime.now(timezone.utc)
+        with self.lock:
+            stages = []
+            for totals in self.stages.values():
+                stage = dict(totals)
+                stage["wall_seconds"] = round(stage.pop("last_finished") - stage.pop("first_started"), 4) #first start to last end
+                stage["seconds"] = round(stage["seconds"], 4)
+                stages.append(stage)
+
+        return {
+            "flow": self.flow,
+            "started_at": self.started_at,
+            "finished_at": finished_at,
+            "duration_seconds": (finished_at - self.started_at).total_seconds(),
+            "requests": sum(stage["requests"] for stage in stages),
+            "bytes_received": sum(stage["bytes"] for stage in stages),
+            "rows_extracted": sum(stage["rows_out"] for stage in stages if stage["stage"] == "extract"),
+            "rows_loaded": sum(stage["rows_out"] for stage in stages if stage["stage"] == "load"),
+            "peak_rss_bytes": max((stage["peak_rss_bytes"] for stage in stages), default=0),
+            "stages": sorted(stages, key=lambda stage: (stage["stage"], stage["entity"])),
+        }
+
+
+_sampler = MemorySampler()
+_current_call: ContextVar[Optional[CallStats]] = ContextVar("etl_current_call", default=None)
+_current_run: Optional[RunStats] = None #tasks run on threads of the flow's process, so the run is process wide
+
+
+def start_run(flow: str) -> RunStats:
+    """Starts collecting the summary of a flow run, calls made before this only go to the prometheus metrics."""
+    global _current_run
+    _current_run = RunStats(flow)
+    return _current_run
+
+
+def count_response(nbytes: int) -> None:
+    """Counts one API response of the instrumented call running in this thread (called by the clients)."""
+    call = _current_call.get()
+    if call is not None:
+        call.requests += 1
+        call.bytes += nbytes
+
+
+def count_rows(value: Any) -> int:
+    """Rows of a stage input/output: a list or DataFrame, or the inserted + updated + skipped of a load summary."""
+    if isinstance(value, pd.DataFrame) or isinstance(value, list):
+        return len(value)
+    if isinstance(value, dict) and "inserted" in value:
+        return value["inserted"] + value["updated"] + value["skipped"]
+    return 0 #None or the message dict of an empty transform
+
+
+def instrumented(stage: str, entity: Callable[..., str], rows_in: Optional[Callable[..., Any]] = None):
+    """
+    Decorator measuring every call of an extract, transform or load function: duration, API requests and bytes
+    (reported by count_response), rows in and out and the peak memory while it ran.
+
+    Args:
+        stage (str): "extract", "transform" or "load"
+        entity (Callable[..., str]): Gets the call's arguments and returns the entity name (e.g. "clockify_time_entries")
+        rows_in (Optional[Callable[..., Any]]): Gets the call's arguments and returns the stage input, counted with count_rows
+
+    Returns:
+        Callable: The decorator.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            name = entity(*args, **kwargs)
+            rows = count_rows(rows_in(*args, **kwargs)) if rows_in else 0
+            call = CallStats()
+            token = _current_call.set(call)
+            memory = _sampler.start()
+            started_at = time.time()
+            started = time.perf_counter()
+            result = None
+            try:
+                result = fn(*args, **kwargs)
+                return result
+            except Exception as e:
+                result = getattr(e, "summary", None) #a PartialLoadError still counts the rows that were loaded
+                raise
+            finally:
+                seconds = time.perf_counter() - started
+                peak = _sampler.stop(memory)
+                _current_call.reset(token)
+                record(stage, name, started_at, seconds, call.requests, call.bytes, rows, count_rows(result), peak)
+        return wrapper
+    return decorator
+
+
+def record(stage: str, entity: str, started_at: float, seconds: float, requests: int, nbytes: int,
+           rows_in: int, rows_out: int, peak_rss: int) -> None:
+    """Adds one measured call to the prometheus metrics and to the summary of the current run."""
+    STAGE_SECONDS.labels(stage, entity).observe(seconds)
+    if requests:
+        REQUESTS.labels(stage, entity).inc(requests)
+        RESPONSE_BYTES.labels(stage, entity).inc(nbytes)
+    ROWS_IN.labels(stage, entity).inc(rows_in)
+    ROWS_OUT.labels(stage, entity).inc(rows_out)
+
+    run = _current_run
+    if run is not None:
+        run.add(stage, entity, started_at, seconds, requests, nbytes, rows_in, rows_out, peak_rss)
+
+
+def finish_run() -> Optional[Dict[str, Any]]:
+    """
+    Ends the current run: sets the peak memory gauges and returns the summary (see RunStats.finish).
+
+    Returns:
+        Optional[Dict[str, Any]]: The summary, None when no run was started.
+    """
+    global _current_run
+    run, _current_run = _current_run, None
+    if run is None:
+        return None
+
+    summary = run.finish()
+    for stage in summary["stages"]:
+        PEAK_RSS.labels(stage["stage"], stage["entity"]).set(stage["peak_rss_bytes"])
+    return summary
+
+
+def push_metrics(job: str) -> None:
+    """
+    Pushes the ETL metrics to the pushgateway in PROMETHEUS_PUSHGATEWAY (host:port), a flow run is too short
+    lived to be scraped. Without the variable nothing is pushed, a failed push is only printed.
+
+    Args:
+        job (str): Job label of the pushed metrics (the flow name)
+    """
+    gateway = os.getenv("PROMETHEUS_PUSHGATEWAY")
+    if not gateway:
+        return
+    try:
+        push_to_gateway(gateway, job=job, registry=REGISTRY)
+    except OSError as e:
+        print(f"Failed to push the ETL metrics to {gateway}: {e}")
@@ -0,0 +1,67 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class ResponseCache:
+    """
+    Size bounded LRU cache with a TTL, used by the api for GET responses.
+    Every entry is stored with the data version it was built from and is only served while that version is current,
+    so a load by the ETL invalidates everything at once without having to know which entries it affected.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 300.0):
+        """
+        Args:
+            maxsize (int): Max number of entries, the least recently used one is evicted first
+            ttl (float): Seconds an entry is served for, even when the data version did not change
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries: "OrderedDict[Hashable, tuple]" = OrderedDict() #key -> (version, expires at, value)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, version: int) -> Optional[Any]:
+        """
+        Gets a cached value.
+
+        Args:
+            key (Hashable): Key of the entry
+            version (int): Current data version, entries built from another version are dropped
+
+        Returns:
+            Any: The cached value, or None on a miss.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] != version or entry[1] < time.monotonic():
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def set(self, key: Hashable, version: int, value: Any) -> None:
+        """
+        Stores a value, evicting the least recently used entries above maxsize.
+
+        Args:
+            key (Hashable): Key of the entry
+            version (int): Data version the value was built from
+            value (Any): The value to cache
+        """
+        with self.lock:
+            self.entries[key] = (version, time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drops every entry."""
+        with self.lock:
+            self.entries.clear()
@@ -3,11 +3,51 @@ import pandas as pd
 import numpy as np
 import re
 import isodate
-from datetime import datetime
+from datetime import datetime, timedelta
 from api_client.linear_client import LinearClient
+from utils.entity_specs import ENTITY_SPECS, EntitySpec
+from utils.instrumentation import instrumented
 import os
+from functools import lru_cache
 
 
+#camelCase -> snake_case patterns, compiled once instead of on every column of every page
+CAMEL_WORD = re.compile('(.)([A-Z][a-z]+)')
+CAMEL_BOUNDARY = re.compile('([a-z0-9])([A-Z])')
+
+
+@lru_cache(maxsize=4096)
+def camel_to_snake(name: str) -> str:
+    """Memoized camelCase -> snake_case conversion, every page of an entity has the same column names."""
+    return CAMEL_BOUNDARY.sub(r'\1_\2', CAMEL_WORD.sub(r'\1_\2', name)).lower()
+
+
+@lru_cache(maxsize=256)
+def snake_columns(columns: tuple, strip: tuple = ()) -> tuple:
+    """
+    Output names of a whole set of raw columns, so a page whose columns were seen before costs one lookup.
+
+    Args:
+        columns (tuple): Raw (flattened) column names.
+        strip (tuple): Substrings removed before the conversion.
+
+    Returns:
+        tuple: The snake_case names, in the same order (a tuple, so the cached value can not be mutated).
+    """
+    names = []
+    for name in columns:
+        for substring in strip:
+            name = name.replace(substring, "")
+        names.append(camel_to_snake(name))
+    return tuple(names)
+
+
+#the forms clockify emits (PT1H30M, PT45S, P1DT2H, ...), anything else is left to isodate
+ISO_DURATION = re.compile(
+    r"^P(?:(?P<weeks>\d+(?:\.\d+)?)W)?(?:(?P<days>\d+(?:\.\d+)?)D)?"
+    r"(?:T(?:(?P<hours>\d+(?:\.\d+)?)H)?(?:(?P<minutes>\d+(?:\.\d+)?)M)?(?:(?P<seconds>\d+(?:\.\d+)?)S)?)?$"
+)
+DURATION_SECONDS = {"weeks": 604800, "days": 86400, "hours": 3600, "minutes": 60, "seconds": 1}
 
 
 class Transformer:
@@ -18,88 +58,157 @@ class Transformer:
     This class includes methods to process different Clockify entities such as clients,
     projects, users, tasks, and time entries. It also includes helper functions to normalize 
     column names and parse data formats.
+    Every process_* method runs the same engine (transform) with the spec of its entity (see utils/entity_specs.py).
     """
 
-    def process_clockify_clients(self, data: dict) -> pd.DataFrame:
+    def __init__(self, specs: dict[str, EntitySpec] | None = None):
         """
-        Transforms raw clockify clients JSON data into a cleaned DataFrame.
-        
         Args:
-            data (dict): Raw JSON response from the Clockify clients endpoint.
-        
+            specs (dict[str, EntitySpec] | None): Entity name -> spec, defaults to ENTITY_SPECS.
+        """
+        self.specs = specs if specs is not None else ENTITY_SPECS
+
+    @instrumented("transform", lambda self, entity, *args, **kwargs: entity, rows_in=lambda self, entity, data: data)
+    def transform(self, entity: str, data: list[dict]) -> pd.DataFrame:
+        """
+        Runs the spec of an entity over its raw JSON records. Every step works on whole columns:
+        flattening, renaming, selecting the table columns and casting them to the types of the model.
+        Nulls are left as pandas nulls (NaN/NaT/NA), the db handler turns them into None when it serializes the rows.
+
+        Args:
+            entity (str): Key of the spec in self.specs (e.g. "clockify_time_entries").
+            data (list[dict]): Raw JSON records of the entity.
+
         Returns:
-            pd.DataFrame: Cleaned and structured DataFrame.
+            pd.DataFrame: One row per record with the columns of the table (plus the spec's keep columns).
         """
-        if data:
-            df = pd.json_normalize(data, sep="_")
-            df = df.replace({"": None})
-            df.columns = [self.camel_to_snake(col) for col in df.columns] #helper function to convert names from camel case to snake case
-            return df
-        else:
-            return {"message": "No clockify clients in the workspace for transformed."}
+        spec = self.specs[entity]
+        if not data:
+            return {"message": f"No {entity.replace('_', ' ')} in the workspace to be transformed."}
+
+        df = self.flatten(data)
+
+        df.columns = snake_columns(tuple(df.columns), spec.strip)
+
+        for source, target in spec.rename.items(): #renamed values fill the gaps of an existing column instead of duplicating it
+            if source in df.columns:
+                values = df.pop(source)
+                df[target] = values if target not in df.columns else df[target].where(df[target].notna(), values)
+
+        for list_col, fields in spec.first_item.items():
+            if list_col in df.columns:
+                first = df.pop(list_col).str[0] #first item of every list, NaN for empty/missing lists
+                items = self.flatten([item if isinstance(item, dict) else {} for item in first])
+                for field, target in fields.items():
+                    df[target] = items[field].to_numpy() if field in items.columns else None
+
+        df = df.reindex(columns=spec.columns) #table columns in table order, missing ones become null, the rest is dropped
+
+        for col in spec.list_columns: #lists are python objects, there is no way around touching each one
+            df[col] = df[col].map(lambda x: (str(x) if x else None) if isinstance(x, list) else x)
+
+        for aware in (False, True): #every datetime column with the same tz handling is parsed in a single call
+            cols = [col for col, tz in spec.datetime_columns.items() if tz == aware]
+            if cols:
+                df[cols] = self.parse_datetimes(df[cols], aware)
+
+        for col in spec.duration_columns:
+            df[col] = self.parse_durations(df[col])
+
+        if spec.float_columns:
+            df[spec.float_columns] = df[spec.float_columns].apply(pd.to_numeric, errors="coerce").astype("float64")
+        if spec.integer_columns:
+            df[spec.integer_columns] = df[spec.integer_columns].apply(pd.to_numeric, errors="coerce").round().astype("Int64")
+        if spec.boolean_columns:
+            df[spec.boolean_columns] = df[spec.boolean_columns].astype("boolean")
 
-    def process_clockify_projects(self, data: dict) -> pd.DataFrame:
+        return df
+
+    def flatten(self, data: list[dict]) -> pd.DataFrame:
         """
-        Transforms raw clockify projects JSON data including nested memberships into a cleaned DataFrame.
-        
+        Same columns as pd.json_normalize(data, sep="_"), but nested objects are expanded a whole column at a time
+        instead of walking every record in python, which is what made json_normalize the slowest step of a transform.
+        A nested object that is null in some records just leaves nulls in the expanded columns.
+
         Args:
-            data (dict): Raw JSON response from the Clockify projects endpoint.
-        
+            data (list[dict]): Raw JSON records.
+
         Returns:
-            pd.DataFrame: Cleaned and structured DataFrame.
+            pd.DataFrame: One column per leaf field, nested names joined with "_".
         """
-        if data:
-            df = pd.json_normalize(data, sep="_")
-            membership_col = df['memberships'] #membership col extraction
-            m_flat_list = [] #to store the membership details
+        df = pd.DataFrame.from_records(data)
+        pending = list(df.columns)
+        while pending:
+            col = pending.pop()
+            if df[col].dtype != object or not any(isinstance(value, dict) for value in df[col].to_numpy()):
+                continue
+            nested = pd.DataFrame.from_records(
+                [value if isinstance(value, dict) else {} for value in df[col].to_numpy()], index=df.index
+            ).add_prefix(f"{col}_")
+            position = df.columns.get_loc(col) #keep the nested fields where their parent was
+            df = pd.concat([df.iloc[:, :position], nested, df.iloc[:, position + 1:]], axis=1)
+            pending.extend(nested.columns) #objects nested deeper get expanded in a later round
+        return df
+
+    def parse_datetimes(self, df: pd.DataFrame, aware: bool) -> pd.DataFrame:
+        """
+        Parses several columns of ISO 8601 strings with one to_datetime call over all their values.
 
-            for item in membership_col: #for each 'array' of membership details, extract the details and extend(cool method/func btw) them to the list
-                if isinstance(item, list):
-                    m_flat_list.extend(item)
+        Args:
+            df (pd.DataFrame): The string columns.
+            aware (bool): Keep the values timezone aware (UTC), naive UTC otherwise (TIMESTAMP without time zone).
 
-            m_df = pd.DataFrame(m_flat_list) #membership array to df
-            df_final = pd.concat([df, m_df], axis=1) # (dfs married to each other: you may kiss the bride)
-            df_final = df_final.drop(columns=['memberships']) #
-            df_final.columns = [self.camel_to_snake(col_name) for col_name in df_final.columns]
+        Returns:
+            pd.DataFrame: The parsed columns.
+        """
+        flat = pd.Series(df.to_numpy(dtype=object).ravel(order="F")) #column after column
+        parsed = pd.to_datetime(flat, utc=True, errors="coerce", format="ISO8601")
+        if not aware:
+            parsed = parsed.dt.tz_localize(None)
+
+        rows = len(df)
+        return pd.DataFrame(
+            {col: parsed.iloc[i * rows:(i + 1) * rows].to_numpy() for i, col in enumerate(df.columns)},
+            index=df.index,
+        )
+
+    def process_clockify_clients(self, data: list[dict]) -> pd.DataFrame:
+        """
+        Transforms raw clockify clients JSON data into a cleaned DataFrame (see ENTITY_SPECS["clockify_clients"]).
 
-            arr = ["budget_estimate", "estimate_reset", "hourly_rate_amount", "hourly_rate", "cost_rate"]
-            df_final["hourly_rate_amount"] = df_final["hourly_rate_amount"].astype(float)
-            df_final[arr] = df_final[arr].apply(pd.to_numeric, errors='coerce')
-            df_final.replace({pd.NaT: None, np.nan: None, "": None, "[]": None}, inplace=True) #fix all types of nulls to None(without this? my code broke a lot)
+        Args:
+            data (list[dict]): Raw JSON response from the Clockify clients endpoint.
 
-            return df_final
-        else:
-            return {"message": "No clockify clients in the workspace to be transformed."}
+        Returns:
+            pd.DataFrame: Cleaned and structured DataFrame.
+        """
+        return self.transform("clockify_clients", data)
 
-    def process_clockify_users(self, data: dict) -> pd.DataFrame:
+    def process_clockify_projects(self, data: list[dict]) -> pd.DataFrame:
         """
-        Transforms raw clockify users JSON data into a cleaned DataFrame.
-        
+        Transforms raw clockify projects (first membership flattened) JSON data into a cleaned DataFrame (see ENTITY_SPECS["clockify_projects"]).
+
         Args:
-            data (dict): Raw JSON response from the Clockify users endpoint.
-        
+            data (list[dict]): Raw JSON response from the Clockify projects endpoint.
+
         Returns:
             pd.DataFrame: Cleaned and structured DataFrame.
         """
-        if data:
-            df = pd.json_normalize(data, sep="_")
-
-            cast_cols = ['customFields', 'memberships']
-            for col in cast_cols:
-                if col in df.columns:
-                    df[col] = df[col].apply(lambda x: str(x) if isinstance(x, list) else x) #convert cols to strings
-
-            df = df.replace({"": None, "[]": None})
-            df.columns = (
-                df.columns
-                .str.replace("settings_", "", regex=False)
-                .str.replace("ReportSettings", "", regex=False) #these were part od the cols header names, had to remove them for readability
-            )
-            df.columns = [self.camel_to_snake(col_name) for col_name in df.columns]
-            return df
-        else:
-            return {"message": "No clockify users in the workspace to be transformed."}
+        return self.transform("clockify_projects", data)
+
+    def process_clockify_users(self, data: list[dict]) -> pd.DataFrame:
+        """
+        Transforms raw clockify users JSON data into a cleaned DataFrame (see ENTITY_SPECS["clockify_users"]).
+
+        Args:
+            data (list[dict]): Raw JSON response from the Clockify users endpoint.
+
+        Returns:
+            pd.DataFrame: Cleaned and structured DataFrame.
+        """
+        return self.transform("clockify_users", data)
 
+    @instrumented("transform", lambda self, *args, **kwargs: "clockify_time_entries_in_progress", rows_in=lambda self, data: data)
     def process_clockify_time_entries_in_progress(self, data: dict) -> pd.DataFrame:
         """
         Converts in-progress time entry data into a DataFrame (used for status tracking).
@@ -118,271 +227,163 @@ class Transformer:
 
     def process_clockify_time_entries_user(self, data: list[dict]) -> pd.DataFrame:
         """
-        Transforms raw clcokify time entry data into a cleaned DataFrame with datetime and duration handling.
-        
+        Transforms raw clockify time entries JSON data into a cleaned DataFrame (see ENTITY_SPECS["clockify_time_entries"]).
+
         Args:
-            data (list[dict]): List of time entry objects from Clockify API.
-        
+            data (list[dict]): Raw JSON response from the Clockify user time entries endpoint.
+
         Returns:
-            pd.DataFrame: Cleaned DataFrame of user time entries.
+            pd.DataFrame: Cleaned and structured DataFrame.
         """
-        if data:
-            df = pd.json_normalize(data, sep="_")
-            df = df.rename(columns={"type": "type_my"})
-            df.columns = [self.camel_to_snake(col_name) for col_name in df.columns] #changing the naming convention from camelCase to snake_case
-
-            df[["hourly_rate_amount", "cost_rate_amount"]] = df[["hourly_rate_amount", "cost_rate_amount"]].astype(float) #casting to float
-
-            cast_cols = ['tag_ids', 'custom_field_values'] #nned to casted to strings
-            for col in cast_cols:
-                if col in df.columns:
-                    df[col] = df[col].apply(lambda x: str(x) if isinstance(x, list) else x) #casting cols to strings
+        return self.transform("clockify_time_entries", data)
 
-            df['time_interval_duration'] = df['time_interval_duration'].apply(self.safe_parse_duration) #convertion from string to duration
-
-            df[["time_interval_start", "time_interval_end"]] = df[["time_interval_start", "time_interval_end"]].apply(pd.to_datetime, errors="coerce")
+    def process_clockify_tasks(self, data: list[dict]) -> pd.DataFrame:
+        """
+        Transforms raw clockify tasks JSON data into a cleaned DataFrame (see ENTITY_SPECS["clockify_tasks"]).
 
-            df['time_interval_start'] = df['time_interval_start'].dt.tz_localize(None)
-            df['time_interval_end'] = df['time_interval_end'].dt.tz_localize(None) #remove timezones
+        Args:
+            data (list[dict]): Raw JSON response from the Clockify tasks endpoint.
 
-            df.replace({pd.NaT: None, np.nan: None, "": None, "[]": None}, inplace=True) #same type of NULL
+        Returns:
+            pd.DataFrame: Cleaned and structured DataFrame.
+        """
+        return self.transform("clockify_tasks", data)
 
-            return df
-        else:
-            return {"message": "No clockify time_entries in the workspace to be transformed."}
+    ###################################Tranformer for the linear client
 
-    def process_clockify_tasks(self, data: dict) -> pd.DataFrame:
+    def process_linear_customers(self, data: list[dict]) -> pd.DataFrame:
         """
-        Transforms raw task JSON data into a cleaned DataFrame.
-        
+        Transforms raw linear customers JSON data into a cleaned DataFrame (see ENTITY_SPECS["linear_customers"]).
+
         Args:
-            data (dict): Raw JSON response from the Clockify tasks endpoint.
-        
+            data (list[dict]): Raw JSON response from the Linear customers endpoint.
+
         Returns:
             pd.DataFrame: Cleaned and structured DataFrame.
         """
-        if data:
-            df = pd.json_normalize(data, sep="_")
-            df.columns = [self.camel_to_snake(col_name) for col_name in df.columns] #cols names from camelCase to snake_case
-            df[["hourly_rate", "cost_rate"]] = df[["hourly_rate", "cost_rate"]].astype(float) #casting cols to floats
-
-            cast_cols = ['assignee_ids', 'user_group_ids'] #need to be casted to strings
-            for col in cast_cols:
-                if col in df.columns:
-                    df[col] = df[col].apply(lambda x: str(x) if isinstance(x, list) else x)
+        return self.transform("linear_customers", data)
 
-            df['duration'] = df['duration'].apply(self.safe_parse_duration) #conversion of strings to duration
-            df.replace({pd.NaT: None, np.nan: None, "": None, "[]": None}, inplace=True) #NULL must be consistent
-
-            return df
-        else:
-            return {"message": "No clockify tasks in the workspace to be transformed."}
-    
-    ###################################Tranformer for the linear client
-
-    def process_linear_customers(self, data: dict) -> pd.DataFrame: #empty for now
+    def process_linear_users(self, data: list[dict]) -> pd.DataFrame:
         """
-        Transforms raw  linear customers JSON data into a cleaned DataFrame.
-        
+        Transforms raw linear users JSON data into a cleaned DataFrame (see ENTITY_SPECS["linear_users"]).
+
         Args:
-            data (dict): Raw JSON response from the Linear customers endpoint.
-        
+            data (list[dict]): Raw JSON response from the Linear users endpoint.
+
         Returns:
             pd.DataFrame: Cleaned and structured DataFrame.
         """
-        if data:
-            df = pd.json_normalize(data, sep="_")
-            df.columns = [self.camel_to_snake(col) for col in df.columns]
-            df[['created_at','archived_at','updated_at']] = df[['created_at','archived_at','updated_at']].apply(
-                pd.to_datetime, errors="coerce"
-            ) #conversion from strings to time
-            return df
-        else:
-            return {"message": "No linear customers in the workspace to be transformed."}
-    
-    def process_linear_users(self, data: dict) -> pd.DataFrame:
+        return self.transform("linear_users", data)
+
+    def process_linear_projects(self, data: list[dict]) -> pd.DataFrame:
         """
-        Transforms raw  linear users JSON data into a cleaned DataFrame.
-        
+        Transforms raw linear projects JSON data into a cleaned DataFrame (see ENTITY_SPECS["linear_projects"]).
+
         Args:
-            data (dict): Raw JSON response from the Linear users endpoint.
-        
+            data (list[dict]): Raw JSON response from the Linear projects endpoint.
+
         Returns:
             pd.DataFrame: Cleaned and structured DataFrame.
         """
-        if data:
-            df = pd.json_normalize(data, sep="_")
-            df.columns = [self.camel_to_snake(col) for col in df.columns]
+        return self.transform("linear_projects", data)
 
-            df[['archived_at','status_until_at', 'created_at', 'updated_at']] = df[['archived_at','status_until_at', 'created_at', 'updated_at']].apply(
-                pd.to_datetime, errors="coerce"
-            )
+    def process_linear_issues(self, data: list[dict]) -> pd.DataFrame:
+        """
+        Transforms raw linear issues JSON data into a cleaned DataFrame (see ENTITY_SPECS["linear_issues"]).
 
+        Args:
+            data (list[dict]): Raw JSON response from the Linear issues endpoint.
 
-            df.replace({pd.NaT: None, np.nan: None, "": None, "[]": None}, inplace=True)
-        
+        Returns:
+            pd.DataFrame: Cleaned and structured DataFrame.
+        """
+        return self.transform("linear_issues", data)
 
-            return df
-        else:
-            return {"message": "No linear users in the workspace to be transformed."}
-    
-    def process_linear_projects(self, data: dict) -> pd.DataFrame:
+    def process_linear_cycles(self, data: list[dict]) -> pd.DataFrame:
         """
-        Transforms raw  linear projects JSON data into a cleaned DataFrame.
-        
+        Transforms raw linear cycles JSON data into a cleaned DataFrame (see ENTITY_SPECS["linear_cycles"]).
+
         Args:
-            data (dict): Raw JSON response from the Linear projects endpoint.
-        
+            data (list[dict]): Raw JSON response from the Linear cycles endpoint.
+
         Returns:
             pd.DataFrame: Cleaned and structured DataFrame.
         """
-        if data:
-            df = pd.json_normalize(data, sep="_")
-            df.columns = [self.camel_to_snake(col) for col in df.columns]
-
-            datetime_cols = ['start_date', 'started_at', 'created_at', 'completed_at']
-
-            
-            for col in datetime_cols:
-                df[col] = pd.to_datetime(df[col], errors='coerce') #conversion to date time from string (apply funct could also do the joj ;))
-
-            desired_order = [
-                "id",
-                "creator_id",
-                "name",
-                "scope",
-                "start_date",
-                "started_at",
-                "created_at",
-                "completed_at",
-                "lead_id",
-                "description",
-                "priority",
-                "status_type",
-                "teams_nodes"
-            ]
-
-            df = df[desired_order]
-
-            # Replace NaT/nan/empty with None for DB insertion
-            df.replace({pd.NaT: None, np.nan: None, "": None, "[]": None}, inplace=True)
+        return self.transform("linear_cycles", data)
 
-            return df
-        else:
-            return {"message": "No linear projects in the workspace to be transformed."}
-    
-    def process_linear_issues(self, data:dict) -> pd.DataFrame:
+    def process_linear_teams(self, data: list[dict]) -> pd.DataFrame:
         """
-        Transforms raw  linear issues JSON data into a cleaned DataFrame.
-        
+        Transforms raw linear teams JSON data into a cleaned DataFrame (see ENTITY_SPECS["linear_teams"]).
+
         Args:
-            data (dict): Raw JSON response from the Linear issues endpoint.
-        
+            data (list[dict]): Raw JSON response from the Linear teams endpoint.
+
         Returns:
             pd.DataFrame: Cleaned and structured DataFrame.
         """
-        if data:
-            df = pd.json_normalize(data, sep="_")
-            df.columns = [self.camel_to_snake(col) for col in df.columns]
-            # df[['completed_at','created_at', 'triaged_at', 'updated_at', 'added_to_project_at', 'added_to_cycle_at', 'added_to_team_at', 'started_at', 'canceled_at', 'snoozed_until_at', 'started_triage_at']] = df['time_interval_duration'].apply(self.safe_parse_duration)
-
-            df[['completed_at','created_at', 'triaged_at', 'updated_at', 'added_to_project_at', 'added_to_cycle_at', 'added_to_team_at', 'started_at', 'canceled_at', 'snoozed_until_at', 'started_triage_at', 'due_date']] = df[['completed_at','created_at', 'triaged_at', 'updated_at', 'added_to_project_at', 'added_to_cycle_at', 'added_to_team_at', 'started_at', 'canceled_at', 'snoozed_until_at', 'started_triage_at', 'due_date']].apply(
-                pd.to_datetime, errors="coerce"
-            )
-
-            #the following are null hence removed ("supervisor_id", "delegate_id", "snoozed_by_id",)
-
-            desired_order = [
-                "id",
-                "title",
-                "description",
-                "priority",
-                "estimate",
-                "assignee_id",
-                "creator_id",
-                "project_id", 
-                "team_id",
-                "created_at",
-                "started_at",
-                "completed_at",
-                "due_date",
-                "triaged_at",
-                "canceled_at",
-                "snoozed_until_at",
-                "added_to_cycle_at",
-                "added_to_project_at",
-                "added_to_team_at"
-            ]
-
-            df = df[desired_order]
-
-
-            df.replace({pd.NaT: None, np.nan: None, "": None, "[]": None}, inplace=True)
+        return self.transform("linear_teams", data)
 
 
-            return df
-        else:
-            return {"message": "No linear issues in the workspace to be transformed."}
-    
-    def process_linear_cycles(self, data:dict): #empty for now
+    def camel_to_snake(self, name: str) -> str:
         """
-        Transforms raw  linear cycles JSON data into a cleaned DataFrame.
+        Converts a camelCase string to snake_case.
         
         Args:
-            data (dict): Raw JSON response from the Linear cycles endpoint.
+            name (str): CamelCase string.
         
         Returns:
-            pd.DataFrame: Cleaned and structured DataFrame.
+            str: Converted snake_case string.
         """
-        if data:
-            df = pd.json_normalize(data, sep="_")
-            df.columns = [self.camel_to_snake(col) for col in df.columns]
-            df[['completed_at','created_at','ends_at', 'starts_at', 'updated_at', 'archived_at']]=df[['completed_at','created_at','ends_at', 'starts_at', 'updated_at', 'archived_at']].apply(
-                pd.to_datetime, errors="coerce"
-            )   
-            df.replace({pd.NaT: None, np.nan: None, "": None, "[]": None}, inplace=True)
-            return df
-        else:
-            return {"message": "No linear cycles in the workspace to be transformed."}
-    
-    def process_linear_teams(self, data:dict):
+        return camel_to_snake(name)
+
+    def parse_durations(self, values: pd.Series) -> pd.Series:
         """
-        Transforms raw  linear teams JSON data into a cleaned DataFrame.
-        
+        Parses a column of ISO 8601 duration strings without isodate per row: every distinct string is parsed once
+        (durations repeat a lot), the regex extracts its components into numeric columns and their sum in seconds
+        becomes a timedelta. Only strings the regex does not cover go through isodate (safe_parse_duration).
+
         Args:
-            data (dict): Raw JSON response from the Linear teams endpoint.
-        
+            values (pd.Series): Duration strings, nulls allowed.
+
         Returns:
-            pd.DataFrame: Cleaned and structured DataFrame.
+            pd.Series: timedelta64 column, NaT for nulls and unparseable values.
         """
-        if data:
-            df = pd.json_normalize(data, sep="_")
-            df.columns = [self.camel_to_snake(col) for col in df.columns]
-
-            df[['created_at','archived_at']]=df[['created_at','archived_at']].apply(
-                pd.to_datetime, errors="coerce"
-            )       
-            df.replace({pd.NaT: None, np.nan: None, "": None, "[]": None}, inplace=True)
+        codes, uniques = pd.factorize(values) #nulls get code -1
+        text = pd.Series(uniques, dtype=object).astype("string")
 
-            return df
-        else:
-            return {"message": "No clockify teams in the workspace to be transformed."}
-        
+        parts = text.str.extract(ISO_DURATION).apply(pd.to_numeric)
+        seconds = sum(parts[unit].fillna(0) * factor for unit, factor in DURATION_SECONDS.items())
+        matched = parts.notna().any(axis=1) #a bare "P"/"PT" matches without any component, let isodate judge it
+        parsed = pd.to_timedelta(seconds.where(matched), unit="s").dt.round("us") #postgres intervals stop at microseconds
 
+        leftover = ~matched
+        if leftover.any():
+            fallback = pd.Series(pd.to_timedelta([self.fallback_duration(value) for value in text[leftover]], errors="coerce"),
+                                 index=text.index[leftover])
+            parsed = parsed.mask(leftover, fallback) #a new series, writing into the .dt result is lost under copy-on-write
 
+        lookup = np.append(parsed.to_numpy(), np.timedelta64("NaT")) #code -1 picks the trailing NaT
+        return pd.Series(lookup[codes], index=values.index, name=values.name)
 
-    def camel_to_snake(self, name: str) -> str:
+    def fallback_duration(self, value: str):
         """
-        Converts a camelCase string to snake_case.
-        
+        Parses a duration the regex of parse_durations does not cover, durations in months or years have no fixed length.
+
         Args:
-            name (str): CamelCase string.
-        
+            value (str): Duration string.
+
         Returns:
-            str: Converted snake_case string.
+            timedelta | None: Parsed duration, None when it is invalid or not a fixed length.
         """
-        s1 = re.sub('(.)([A-Z][a-z]+)', r'\1_\2', name)
-        return re.sub('([a-z0-9])([A-Z])', r'\1_\2', s1).lower()
+        try:
+            duration = self.safe_parse_duration(value)
+        except (isodate.ISO8601Error, ValueError) as e:
+            print(f"Could not parse duration '{value}': {e}")
+            return None
+        if not isinstance(duration, timedelta):
+            print(f"Duration '{value}' has no fixed length, stored as null.")
+            return None
+        return duration
 
     def safe_parse_duration(self, x) -> pd.Timedelta | None:
         """